@@ -0,0 +1,50 @@
+import numpy as np
+
+from feature_engine import FeatureMatrix
+
+# Month-by-month attribution of the bullish probability and the VIX-adjusted expected return.
+# Both models are linear in the right space, so the split is exact and additive:
+#
+#   log-odds(t)        = intercept + sum_j coef_j * (x_tj - mean_j) / scale_j
+#   expected return(t) = alpha + beta * PROB(t) + delta * GST_SHOCK_NEG(t) - |theta| * VIX_SHOCK_POS(t)
+#
+# Each term is one column, so the columns of a row add up to its log-odds / expected return
+# exactly (up to float rounding), and the whole history comes out of one broadcast multiply.
+# The bullish probability is the logistic of the log-odds total. It is nonlinear, so it is
+# reported alongside the terms rather than split.
+
+LOGODDS_PREFIX = "LOGODDS_"
+RETURN_PREFIX = "RETURN_"
+
+
+def attribution_names(features):
+    return (
+        [LOGODDS_PREFIX + "INTERCEPT"] + [LOGODDS_PREFIX + name for name in features]
+        + ["LOGODDS", "BULLISH_PROBABILITY"]
+        + [RETURN_PREFIX + name for name in ("INTERCEPT", "BULLISH_PROBABILITY", "GST_SHOCK_NEG", "VIX_SHOCK_POS")]
+        + ["EXPECTED_RETURN"]
+    )
+
+
+def build_attribution(kernel, X, ret_coef, signals):
+    # kernel: the LinearKernel; X: (n, 8) raw features; ret_coef: (alpha, beta, delta, theta);
+    # signals: (n, 3) stored BULLISH_PROBABILITY, GST_SHOCK_NEG, VIX_SHOCK_POS
+    X = np.asarray(X, dtype=float)
+    signals = np.asarray(signals, dtype=float)
+    n, p = X.shape
+    alpha, beta, delta, theta = ret_coef
+    names = attribution_names(kernel.features)
+    values = np.empty((n, len(names)), order="F")
+
+    values[:, 0] = kernel.intercept
+    logodds = values[:, 1:p + 1]
+    np.multiply((X - kernel.mean) / kernel.scale, kernel.coef, out=logodds)
+    values[:, p + 1] = values[:, :p + 1].sum(axis=1)
+    values[:, p + 2] = 1.0 / (1.0 + np.exp(-values[:, p + 1]))
+
+    terms = values[:, p + 3:p + 7]
+    terms[:, 0] = alpha
+    np.multiply(signals, [beta, delta, -abs(theta)], out=terms[:, 1:])
+    values[:, p + 7] = terms.sum(axis=1)
+    values.flags.writeable = False
+    return FeatureMatrix(names, values)
@@ -0,0 +1,155 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+
+from sensex_macro_forecast_all_horizons import (
+    FEATURES, SCENARIO_MULTS, FORECAST_HORIZONS, SHOCK_WINDOW,
+    load_model_data, add_shock_features, fit_return_model, recent_expected_return,
+)
+from path_engine import constant_rate_paths, simulate_paths, percentile_bands
+
+# Walk-forward validation of the full model stack (scaler -> LogisticRegression ->
+# shock variables -> return regression). At every expanding-window cutoff the stack is
+# refitted on the rows before the cutoff only, and levels are forecast h months ahead
+# from the last training close. Cutoffs are independent, so they run in a process pool.
+
+# Simulated paths per cutoff for the band coverage check
+BAND_PATHS = 2000
+# Central band scored for coverage (p5 - p95 -> nominal 90%)
+BAND_LOW, BAND_HIGH = 5, 95
+
+# Set once per worker by the pool initializer so the frame is not re-pickled per task
+_df = None
+
+
+def _init_worker(df):
+    global _df
+    _df = df
+
+
+def fit_stack(train):
+    # Refit everything the forecaster uses on the training window only
+    train = train.copy()
+    direction = (train["SENSEX_RETURN"] > 0).astype(int)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(train[FEATURES])
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_scaled, direction)
+
+    train["BULLISH_PROBABILITY"] = model.predict_proba(X_scaled)[:, 1]
+    # Point-in-time shocks arrive precomputed on the whole frame (see run_backtest)
+    if "GST_SHOCK_NEG" not in train:
+        add_shock_features(train)
+    ret_model = fit_return_model(train)
+
+    return {
+        "expected_return": recent_expected_return(train, ret_model),
+        "level": train["CLOSE_SENSEX"].iloc[-1],
+        "vol": train["SENSEX_RETURN"].std(),
+    }
+
+
+def evaluate_cutoff(cutoff, horizons, scenarios, seed=42):
+    # Fit on rows [0, cutoff) and score every horizon x scenario that has an actual outcome
+    df = _df
+    fitted = fit_stack(df.iloc[:cutoff])
+    start = fitted["level"]
+
+    horizons = [h for h in horizons if cutoff - 1 + h < len(df)]
+    if not horizons:
+        return []
+    max_horizon = max(horizons)
+
+    mults = np.array([SCENARIO_MULTS[s] for s in scenarios])
+    rates = fitted["expected_return"] * mults
+    paths = constant_rate_paths(start, rates, max_horizon)
+
+    rng = np.random.default_rng(seed + cutoff)
+    shocks = rng.standard_normal((BAND_PATHS, max_horizon)) * fitted["vol"]
+
+    rows = []
+    for s_idx, scenario in enumerate(scenarios):
+        sims = simulate_paths(start, rates[s_idx], shocks)
+        bands = percentile_bands(sims, (BAND_LOW, BAND_HIGH))
+        for h in horizons:
+            actual = df["CLOSE_SENSEX"].iloc[cutoff - 1 + h]
+            forecast = paths[s_idx, h - 1]
+            lower, upper = bands[BAND_LOW][h - 1], bands[BAND_HIGH][h - 1]
+            rows.append({
+                "cutoff": cutoff,
+                "horizon": h,
+                "scenario": scenario,
+                "forecast": forecast,
+                "actual": actual,
+                "hit": np.sign(forecast - start) == np.sign(actual - start),
+                "abs_error": abs(forecast - actual),
+                "covered": lower <= actual <= upper,
+            })
+    return rows
+
+
+def run_backtest(horizons=FORECAST_HORIZONS, scenarios=tuple(SCENARIO_MULTS),
+                 min_train=36, step=1, workers=None, df=None):
+    if df is None:
+        df = load_model_data()
+    # Expanding / trailing shocks at row t only depend on rows <= t, so one O(n) pass over
+    # the full history gives every cutoff's training shocks. Full-history standardization
+    # differs per training window and is refitted inside each cutoff instead.
+    if SHOCK_WINDOW != "full":
+        df = add_shock_features(df.copy())
+    cutoffs = list(range(min_train, len(df), step))
+
+    if workers == 1:
+        _init_worker(df)
+        results = [evaluate_cutoff(c, horizons, scenarios) for c in cutoffs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df,)) as pool:
+            results = list(pool.map(
+                evaluate_cutoff, cutoffs,
+                [horizons] * len(cutoffs), [scenarios] * len(cutoffs)
+            ))
+
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+def summarize(results):
+    # Hit rate, MAE on levels and band coverage per horizon x scenario
+    summary = results.groupby(["horizon", "scenario"]).agg(
+        n=("cutoff", "size"),
+        hit_rate=("hit", "mean"),
+        mae=("abs_error", "mean"),
+        coverage=("covered", "mean"),
+    )
+    return summary.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the Sensex macro model stack")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(FORECAST_HORIZONS))
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIO_MULTS), choices=list(SCENARIO_MULTS))
+    parser.add_argument("--min-train", type=int, default=36, help="rows in the first training window")
+    parser.add_argument("--step", type=int, default=1, help="rows between cutoffs")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (1 runs serially)")
+    parser.add_argument("--output", default=None, help="optional CSV path for the per-cutoff results")
+    args = parser.parse_args()
+
+    results = run_backtest(args.horizons, args.scenarios, args.min_train, args.step, args.workers)
+    if results.empty:
+        print("No cutoff has an observed outcome for the requested horizons")
+        return
+
+    print(summarize(results).to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Saved: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+# Benchmark suite with regression gates for the forecaster and the API hot paths.
+# Every benchmark runs against the real sheet (1x) and against synthetic histories 10x, 100x
+# and 1000x longer from synthetic_data.py, in the schema of data/model_with_vix - Sheet1.csv. Medians
+# are compared with a stored baseline and the run fails when anything got slower than the
+# allowed threshold. Baselines are machine-specific: record one with --save on the machine
+# that runs the gate.
+#
+#   python benchmarks.py                    # compare against benchmarks_baseline.json
+#   python benchmarks.py --save             # record a new baseline
+#   python benchmarks.py --scales 1,10 -k api/
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmarks_baseline.json")
+
+SCALES = (1, 10, 100, 1000)
+# A benchmark fails when its median is this much slower than the baseline ...
+DEFAULT_THRESHOLD = 0.25
+# ... and slower by at least this many milliseconds (keeps sub-millisecond noise out of the gate)
+DEFAULT_MIN_DELTA_MS = 2.0
+
+# Bootstrap resamples for the contribution-interval benchmarks, small enough that
+# resamples x rows stays under contribution_ci.MAX_RESAMPLED_ROWS at 1000x
+CI_RESAMPLES = 20
+
+# Route, method and body for every API endpoint that only reads the loaded model
+ROUTES = [
+    ("GET", "/api/summary", None),
+    ("GET", "/api/contribution", None),
+    ("GET", "/api/expected_sensex", None),
+    ("GET", "/api/vix_adjusted", None),
+    ("GET", "/api/forecasts", None),
+    ("GET", "/api/forecasts?scenario=bull", None),
+    ("GET", "/api/detailed_forecasts", None),
+    ("GET", "/api/forecast_bands?horizon=12&n_paths=10000", None),
+    ("POST", "/api/forecasts/batch", {"horizons": [6, 12, 18], "bands": {"n_paths": 2000}}),
+    ("POST", "/api/scenarios/grid", {
+        "x": {"variable": "VIX", "deltas": list(range(-10, 11))},
+        "y": {"variable": "REPO_LAG1", "deltas": [d / 4 for d in range(-8, 9)]},
+    }),
+    ("POST", "/api/scenarios/sample", {
+        "ranges": {"VIX": [-10, 10], "CRUDE_CHANGE": [-0.1, 0.1]}, "n": 10000,
+    }),
+    ("GET", f"/api/contribution?ci=true&resamples={CI_RESAMPLES}", None),
+    ("GET", "/api/features", None),
+    ("GET", "/api/attribution", None),
+    ("GET", "/api/regimes", None),
+    ("GET", "/api/regimes?horizon=120", None),
+    ("GET", "/api/admin/model", None),
+    ("GET", "/metrics", None),
+]
+
+
+def synthetic_sheet(scale, out_dir, fmt="csv"):
+    # The real sheet at 1x; otherwise a synthetic_data.py history `scale` times as long
+    from sensex_macro_forecast_all_horizons import MODEL_DATA_PATH
+    from synthetic_data import generate
+
+    if scale == 1 and fmt == "csv":
+        path = os.path.join(out_dir, "model_with_vix_x1.csv")
+        shutil.copyfile(MODEL_DATA_PATH, path)
+        return path
+    rows = scale * len(pd.read_csv(MODEL_DATA_PATH))
+    return generate(os.path.join(out_dir, f"model_with_vix_x{scale}.{fmt}"), rows, seed=scale)
+
+
+def measure(fn, setup=None, rounds=5, warmup=1):
+    # Median wall time of fn() over `rounds` runs, with setup() untimed before each one
+    samples = []
+    for i in range(warmup + rounds):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed)
+    return statistics.median(samples)
+
+
+def forecaster_benchmarks(data_path):
+    import contribution_ci
+    from data_store import cache_dir_for
+    from sensex_macro_forecast_all_horizons import FORECAST_HORIZONS, SensexForecaster
+
+    forecaster = SensexForecaster(data_path)
+
+    def drop_cache():
+        shutil.rmtree(cache_dir_for(data_path), ignore_errors=True)
+
+    benches = [
+        ("load_and_prep[cold]", lambda: SensexForecaster(data_path), drop_cache),
+        ("load_and_prep[warm]", forecaster.load_and_prep, None),
+    ]
+    for horizon in FORECAST_HORIZONS:
+        benches.append((f"get_forecast[h={horizon}]", lambda h=horizon: forecaster.get_forecast(h), None))
+        benches.append((f"get_forecast[h={horizon},uncached]",
+                        lambda h=horizon: forecaster._compute_forecast(h, "base"), None))
+    benches += [
+        ("get_vix_adjusted_history", forecaster.get_vix_adjusted_history, None),
+        ("get_contribution_data", forecaster.get_contribution_data, None),
+        (f"contribution_intervals[resamples={CI_RESAMPLES}]",
+         lambda: contribution_ci.contribution_intervals(forecaster, CI_RESAMPLES), contribution_ci._cache.clear),
+        # Lazy per-build matrices, rebuilt from scratch each round
+        ("feature_matrix[build]", forecaster.feature_matrix, lambda: setattr(forecaster, "_features", None)),
+        ("attribution_matrix[build]", forecaster.attribution_matrix,
+         lambda: setattr(forecaster, "_attribution", None)),
+        ("regime_model[build]", forecaster.regime_model, lambda: setattr(forecaster, "_regimes", None)),
+    ]
+    return forecaster, benches
+
+
+def route_benchmarks(client, server):
+    benches = []
+    for method, url, body in ROUTES:
+        def call(method=method, url=url, body=body):
+            response = client.request(method, url, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+        # Clear encoded responses so cached routes measure the payload build, not a dict lookup
+        benches.append((f"api/{method} {url}", call, server.response_cache.clear))
+    return benches
+
+
+def run(scales, rounds, pattern=None, fmt="csv"):
+    os.environ.setdefault("SENSEX_EAGER_LOAD", "0")
+    warnings.filterwarnings("ignore")
+    sys.path.insert(0, BASE_DIR)
+    from fastapi.testclient import TestClient
+    import sensex_macro_forecast_all_horizons as sensex
+    import server
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="sensex-bench-") as tmp, TestClient(server.app) as client:
+        for scale in scales:
+            data_path = synthetic_sheet(scale, tmp, fmt)
+            forecaster, benches = forecaster_benchmarks(data_path)
+            # Serve the routes from the scaled forecaster
+            sensex.registry.install(sensex.DEFAULT_INDEX, forecaster)
+            benches += route_benchmarks(client, server)
+
+            print(f"\n{scale}x ({forecaster.rows} rows)")
+            for name, fn, setup in benches:
+                key = f"{scale}x/{name}"
+                if pattern and pattern not in key:
+                    continue
+                results[key] = measure(fn, setup, rounds)
+                print(f"  {name:<60} {results[key] * 1000:10.2f} ms")
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    regressions = []
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if seconds > base * (1 + threshold) and (seconds - base) * 1000 >= min_delta_ms:
+            regressions.append((key, base, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the forecaster and API routes against a baseline")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)),
+                        help="comma-separated history multipliers (default: 1,10,100,1000)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv",
+                        help="file format of the synthetic histories (parquet needs pyarrow)")
+    parser.add_argument("-k", dest="pattern", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    results = run(scales, args.rounds, args.pattern, args.format)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "machine": f"{platform.machine()} {platform.processor() or platform.system()}",
+                "python": platform.python_version(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": {key: round(value, 6) for key, value in sorted(baseline.items())},
+            }, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save to record one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"\n{len(missing)} benchmarks have no baseline yet (run with --save to record them)")
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    for key, base, seconds in regressions:
+        print(f"FAIL: {key} {base * 1000:.2f} ms -> {seconds * 1000:.2f} ms "
+              f"(+{(seconds / base - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from sensex_macro_forecast_all_horizons import FEATURES, contribution_shares, contribution_label
+
+# Bootstrap confidence intervals for the contribution weights behind /api/contribution.
+# The scaler and the bullish LogisticRegression (the model3.py setup: StandardScaler, then
+# L2-penalized logistic regression with C=1) are refitted on B resamples of the rows. Each
+# refit goes through the same contribution weighting as the served model, and every feature
+# gets its mean share and a percentile interval. Monthly macro data is autocorrelated, so
+# block > 1 draws runs of consecutive months (moving-block bootstrap) instead of single rows.
+#
+# Instead of B separate sklearn fits, each of which costs milliseconds of input validation
+# around a tiny solve, all resamples are fitted at once. This is a batched Newton iteration on
+# sklearn's objective, warm-started from the full-sample fit, so it usually converges in a few
+# steps. Resamples are split into chunks that run in a thread pool, since the batched NumPy
+# kernels release the GIL. Results are cached by a digest of the rows and the settings, so
+# a reload of unchanged data reuses them.
+#
+#   python contribution_ci.py --resamples 1000 --block 6 [--check 50]
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_LEVEL = 90
+DEFAULT_SEED = 42
+# Inverse regularization strength of LogisticRegression()
+C = 1.0
+WORKERS = int(os.environ.get("SENSEX_BOOTSTRAP_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Resample x row x coefficient values held per chunk, which bounds the working memory
+CHUNK_ELEMENTS = 4_000_000
+# Largest resamples x rows a request may ask for; the cost of a bootstrap grows with both
+MAX_RESAMPLED_ROWS = int(os.environ.get("SENSEX_BOOTSTRAP_MAX_ROWS", "2000000"))
+NEWTON_MAX_ITER = 50
+NEWTON_TOL = 1e-10
+CACHE_SIZE = 16
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# Bootstraps being computed, by cache key: a concurrent identical request waits on the running
+# one's Future instead of computing it again, while different settings run independently
+_inflight = {}
+
+
+def resample_indices(n, resamples, block=1, seed=DEFAULT_SEED):
+    # (resamples, n) row indices: iid rows, or moving blocks of `block` consecutive rows
+    rng = np.random.default_rng(seed)
+    if block <= 1:
+        return rng.integers(0, n, (resamples, n))
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, (resamples, n_blocks))
+    return (starts[:, :, None] + np.arange(block)).reshape(resamples, -1)[:, :n]
+
+
+def scale_batch(X):
+    # StandardScaler().fit_transform on every resample of a (B, n, p) stack
+    mean = X.mean(axis=1, keepdims=True)
+    scale = np.sqrt(((X - mean) ** 2).mean(axis=1, keepdims=True))
+    scale[scale < 10 * np.finfo(float).eps] = 1.0
+    return (X - mean) / scale
+
+
+def _objective(theta, Xa, y):
+    # sklearn's penalized loss: 0.5 * |w|^2 + C * sum(logloss); the intercept is not penalized
+    z = np.einsum("bnj,bj->bn", Xa, theta)
+    loss = np.logaddexp(0.0, z) - y * z
+    return 0.5 * (theta[:, 1:] ** 2).sum(axis=1) + C * loss.sum(axis=1)
+
+
+def fit_logistic_batch(Xs, y, theta0):
+    # Newton's method with step halving on B problems at once. Xs: (B, n, p) scaled features,
+    # y: (B, n) 0/1 labels, theta0: (p + 1,) starting [intercept, coef]. Returns (B, p + 1).
+    B, n, p = Xs.shape
+    Xa = np.concatenate([np.ones((B, n, 1)), Xs], axis=2)
+    theta = np.tile(theta0, (B, 1))
+    penalty = np.ones(p + 1)
+    penalty[0] = 0.0
+    f = _objective(theta, Xa, y)
+    for _ in range(NEWTON_MAX_ITER):
+        prob = 1.0 / (1.0 + np.exp(-np.einsum("bnj,bj->bn", Xa, theta)))
+        grad = C * np.einsum("bnj,bn->bj", Xa, prob - y) + penalty * theta
+        hess = C * np.einsum("bni,bn,bnj->bij", Xa, prob * (1 - prob), Xa) + np.diag(penalty)
+        step = np.linalg.solve(hess, grad[:, :, None])[:, :, 0]
+        t = np.ones(B)
+        candidate = theta - step
+        f_new = _objective(candidate, Xa, y)
+        for _ in range(30):
+            worse = f_new > f + 1e-12 * np.abs(f)
+            if not worse.any():
+                break
+            t[worse] *= 0.5
+            candidate[worse] = theta[worse] - t[worse, None] * step[worse]
+            f_new[worse] = _objective(candidate[worse], Xa[worse], y[worse])
+        theta, f = candidate, f_new
+        if np.abs(t[:, None] * step).max() < NEWTON_TOL:
+            break
+    return theta
+
+
+def bootstrap_coefficients(X, y, idx, theta0, workers=WORKERS):
+    # Scaled-space coefficients (len(idx), p) of every resample; NaN rows for resamples that
+    # drew only one class, which LogisticRegression cannot fit
+    labels = y[idx]
+    single = labels.min(axis=1) == labels.max(axis=1)
+    coefs = np.full((len(idx), X.shape[1]), np.nan)
+    idx = idx[~single]
+    B, n = idx.shape
+    if B == 0:
+        return coefs
+    chunk = max(1, CHUNK_ELEMENTS // (n * (X.shape[1] + 1)))
+    # At least one chunk per worker so the pool has something to share
+    chunk = min(chunk, -(-B // max(workers, 1)))
+    bounds = [(lo, min(lo + chunk, B)) for lo in range(0, B, chunk)]
+
+    def run(bound):
+        rows = idx[bound[0]:bound[1]]
+        return fit_logistic_batch(scale_batch(X[rows]), y[rows], theta0)[:, 1:]
+
+    if workers <= 1 or len(bounds) == 1:
+        fitted = [run(bound) for bound in bounds]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fitted = list(pool.map(run, bounds))
+    coefs[~single] = np.concatenate(fitted)
+    return coefs
+
+
+def model_inputs(forecaster):
+    # The forecaster's rows as (features, bullish-month labels), like backtest.fit_stack
+    X = np.column_stack([forecaster.column(name) for name in FEATURES])
+    y = (forecaster.column("SENSEX_RETURN") > 0).astype(float)
+    return X, y
+
+
+def data_digest(X, y):
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def compute_intervals(X, y, served_coef, resamples=DEFAULT_RESAMPLES, block=1,
+                      level=DEFAULT_LEVEL, seed=DEFAULT_SEED, workers=WORKERS):
+    started = time.perf_counter()
+    theta0 = fit_logistic_batch(scale_batch(X[None]), y[None], np.zeros(X.shape[1] + 1))[0]
+    idx = resample_indices(len(X), resamples, block, seed)
+    coefs = bootstrap_coefficients(X, y, idx, theta0, workers)
+    valid = coefs[~np.isnan(coefs).any(axis=1)]
+    if not len(valid):
+        raise ValueError("every resample drew a single class; no intervals to report")
+
+    shares = contribution_shares(valid)
+    tail = (100 - level) / 2
+    lower, upper = np.percentile(shares, [tail, 100 - tail], axis=0)
+    mean = shares.mean(axis=0)
+    served = contribution_shares(served_coef)
+
+    contributions = [
+        {
+            "Feature": contribution_label(name),
+            "Contribution": round(float(served[i]), 1),
+            "Mean": round(float(mean[i]), 1),
+            "Lower": round(float(lower[i]), 1),
+            "Upper": round(float(upper[i]), 1),
+        }
+        for i, name in enumerate(FEATURES)
+    ]
+    return {
+        "resamples": resamples,
+        "failed": resamples - len(valid),
+        "block": block,
+        "level": level,
+        "seed": seed,
+        "seconds": round(time.perf_counter() - started, 3),
+        "contributions": sorted(contributions, key=lambda x: x["Contribution"], reverse=True),
+    }
+
+
+def contribution_intervals(forecaster, resamples=DEFAULT_RESAMPLES, block=1,
+                           level=DEFAULT_LEVEL, seed=DEFAULT_SEED):
+    # Payload of /api/contribution?ci=true, cached by the rows' digest and the settings
+    X, y = model_inputs(forecaster)
+    key = (data_digest(X, y), tuple(forecaster.kernel.coef.tolist()), resamples, block, level, seed)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+        running = _inflight.get(key)
+        if running is None:
+            future = _inflight[key] = Future()
+    if running is not None:
+        return running.result()
+
+    try:
+        result = compute_intervals(X, y, forecaster.kernel.coef, resamples, block, level, seed)
+    except BaseException as exc:
+        with _cache_lock:
+            del _inflight[key]
+        future.set_exception(exc)
+        raise
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        del _inflight[key]
+    future.set_result(result)
+    return result
+
+
+def compare_with_sklearn(X, y, idx):
+    # Largest absolute coefficient difference from LogisticRegression on the given resamples
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    theta0 = fit_logistic_batch(scale_batch(X[None]), y[None], np.zeros(X.shape[1] + 1))[0]
+    ours = bootstrap_coefficients(X, y, idx, theta0, workers=1)
+    worst = 0.0
+    for rows, coef in zip(idx, ours):
+        if np.isnan(coef).any():
+            continue
+        model = LogisticRegression(max_iter=1000, tol=1e-10)
+        model.fit(StandardScaler().fit_transform(X[rows]), y[rows])
+        worst = max(worst, float(np.abs(model.coef_[0] - coef).max()))
+    return worst
+
+
+def main():
+    from sensex_macro_forecast_all_horizons import get_forecaster
+
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for the contribution weights")
+    parser.add_argument("--index", default=None)
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument("--block", type=int, default=1, help="moving-block length in months (1 = iid rows)")
+    parser.add_argument("--level", type=float, default=DEFAULT_LEVEL, help="interval coverage in percent")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--check", type=int, default=0, metavar="N",
+                        help="also refit the first N resamples with sklearn and report the difference")
+    args = parser.parse_args()
+
+    forecaster = get_forecaster(args.index) if args.index else get_forecaster()
+    X, y = model_inputs(forecaster)
+    result = compute_intervals(X, y, forecaster.kernel.coef, args.resamples, args.block,
+                               args.level, args.seed, args.workers)
+    print(f"{'Feature':<14} {'Served':>7} {'Mean':>7} {f'P{(100 - args.level) / 2:g}':>7} "
+          f"{f'P{100 - (100 - args.level) / 2:g}':>7}")
+    for row in result["contributions"]:
+        print(f"{row['Feature']:<14} {row['Contribution']:7.1f} {row['Mean']:7.1f} "
+              f"{row['Lower']:7.1f} {row['Upper']:7.1f}")
+    print(f"{result['resamples']} resamples ({result['failed']} single-class), {result['seconds']:.2f}s")
+    if args.check:
+        idx = resample_indices(len(X), args.resamples, args.block, args.seed)[:args.check]
+        print(f"max |coef - sklearn| over {len(idx)} resamples = {compare_with_sklearn(X, y, idx):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Typed columnar cache for the spreadsheet exports in data/.
+# A sheet is parsed and cleaned once (header normalisation + thousands separators stripped
+# from the numeric columns) and stored as one .npy file per column next to a manifest
+# that records the schema and the source file's size, mtime and SHA-256.
+# Later loads memory-map the columns and only re-ingest when the source CSV changes.
+
+CACHE_DIRNAME = ".cache"
+# Bump when the on-disk layout or cleaning rules change so old caches are rebuilt
+SCHEMA_VERSION = 2
+
+
+def normalize_columns(df):
+    df.columns = df.columns.str.strip().str.upper().str.replace(" ", "_")
+    return df
+
+
+def read_sheet(path):
+    # Sheets are CSV exports; Parquet copies (e.g. from synthetic_data.py) need pyarrow
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def parse_sheet(csv_path, numeric_cols):
+    # The original CSV parse, kept as the single place the cleaning rules live
+    df = normalize_columns(read_sheet(csv_path))
+    for col in numeric_cols:
+        if df[col].dtype == object:
+            df[col] = df[col].astype(str).str.replace(",", "")
+        df[col] = df[col].astype(float)
+    return df
+
+
+def cache_dir_for(csv_path):
+    source_dir, name = os.path.split(os.path.abspath(csv_path))
+    stem, ext = os.path.splitext(name)
+    # A Parquet copy of a sheet gets its own cache next to the CSV's
+    if ext.lower() != ".csv":
+        stem = name
+    return os.path.join(source_dir, CACHE_DIRNAME, stem)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp_path = os.path.join(cache_dir, "manifest.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, "manifest.json"))
+
+
+def _is_current(manifest, csv_path, numeric_cols):
+    # Cheap stat check first; only hash the source when size or mtime moved
+    if manifest is None or manifest.get("schema_version") != SCHEMA_VERSION:
+        return False
+    if manifest.get("numeric_cols") != list(numeric_cols):
+        return False
+
+    stat = os.stat(csv_path)
+    source = manifest["source"]
+    if source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if source["size"] != stat.st_size or source["sha256"] != _file_hash(csv_path):
+        return False
+
+    # Same bytes, new mtime (e.g. a fresh checkout): refresh the stat fields only
+    source["mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_manifest(cache_dir_for(csv_path), manifest)
+    except OSError:
+        pass
+    return True
+
+
+def _write_columns(target_dir, df, csv_path, stat, numeric_cols):
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        entry = {"name": col}
+        if values.dtype == object:
+            # Missing text cells would become the string "nan"; store them as empty strings
+            # plus a mask so they load back as NaN
+            missing = pd.isna(values)
+            values = np.where(missing, "", values).astype(str)
+            if missing.any():
+                entry["missing"] = f"{i:03d}.missing.npy"
+                np.save(os.path.join(target_dir, entry["missing"]), missing, allow_pickle=False)
+        file_name = f"{i:03d}.npy"
+        np.save(os.path.join(target_dir, file_name), values, allow_pickle=False)
+        columns.append({**entry, "dtype": values.dtype.str, "file": file_name})
+
+    _write_manifest(target_dir, {
+        "schema_version": SCHEMA_VERSION,
+        "source": {
+            "path": os.path.basename(csv_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _file_hash(csv_path),
+        },
+        "numeric_cols": list(numeric_cols),
+        "rows": len(df),
+        "columns": columns,
+    })
+
+
+def ingest(csv_path, numeric_cols):
+    # Parse the CSV once and write the typed column files plus manifest
+    df = parse_sheet(csv_path, numeric_cols)
+    stat = os.stat(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    parent = os.path.dirname(cache_dir)
+    os.makedirs(parent, exist_ok=True)
+
+    # Build the new cache beside the old one and swap it in, so readers never see half a cache
+    # Whatever is left of staging afterwards (e.g. a concurrent ingest swapped its own cache in
+    # first and the final rename failed) is removed
+    staging = tempfile.mkdtemp(prefix=".ingest-", dir=parent)
+    retired = staging + ".old"
+    try:
+        _write_columns(staging, df, csv_path, stat, numeric_cols)
+        if os.path.isdir(cache_dir):
+            os.replace(cache_dir, retired)
+        os.replace(staging, cache_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(retired, ignore_errors=True)
+    return df
+
+
+def load_sheet(csv_path, numeric_cols):
+    # Cleaned DataFrame for csv_path, served from the columnar cache when it is current
+    cache_dir = cache_dir_for(csv_path)
+    manifest = _read_manifest(cache_dir)
+    if not _is_current(manifest, csv_path, numeric_cols):
+        try:
+            return ingest(csv_path, numeric_cols)
+        except OSError:
+            # Read-only data directory: fall back to parsing the CSV directly
+            return parse_sheet(csv_path, numeric_cols)
+
+    data = {}
+    missing = {}
+    try:
+        for col in manifest["columns"]:
+            path = os.path.join(cache_dir, col["file"])
+            data[col["name"]] = np.load(path, mmap_mode="r", allow_pickle=False)
+            if "missing" in col:
+                missing[col["name"]] = np.load(os.path.join(cache_dir, col["missing"]), allow_pickle=False)
+    except (OSError, ValueError):
+        # Damaged cache (missing or truncated column file): rebuild it from the source
+        return ingest(csv_path, numeric_cols)
+    df = pd.DataFrame(data)
+    # Text columns come back as fixed-width unicode; restore the object dtype read_csv gives
+    for col in manifest["columns"]:
+        if col["dtype"].lstrip("<>|=").startswith("U"):
+            df[col["name"]] = df[col["name"]].astype(object)
+    for name, mask in missing.items():
+        df.loc[mask, name] = np.nan
+    return df
+
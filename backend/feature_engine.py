@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+
+# Rolling- and expanding-window features in one vectorized pass per column, with no refit per
+# window. Expanding moments use Welford's update
+#   M2(t) = M2(t-1) + (x(t) - mean(t-1)) * (x(t) - mean(t))
+# whose increments are never negative, so its running sum (one cumsum) does not cancel the way
+# E[x^2] - mean^2 does on large-valued series such as FPI flows. Trailing windows are centered
+# over their own values (two passes of `window` shifted slices of the column), so every window's
+# variance is exact however far the series drifts.
+#
+# All features are point-in-time: row t only uses rows <= t. Statistics are population
+# moments (StandardScaler semantics) and a flat window z-scores to 0.
+#
+# The feature matrix for a column set is, per column:
+#   <col>_Z            expanding z-score
+#   <col>_MEAN<w>      trailing mean over w rows (fewer at the start)
+#   <col>_Z<w>         trailing z-score over w rows
+#   <col>_LAG<k>       value k rows earlier (NaN for the first k rows)
+
+
+def _parse_lengths(var, default):
+    # Comma-separated row counts from the environment; every one must be at least 1
+    lengths = tuple(int(v) for v in os.environ.get(var, default).split(",") if v)
+    if any(n < 1 for n in lengths):
+        raise ValueError(f"{var} entries must be >= 1, got {lengths}")
+    return lengths
+
+
+# Trailing windows and lags in the feature matrix, e.g. SENSEX_FEATURE_WINDOWS=3,6,12
+FEATURE_WINDOWS = _parse_lengths("SENSEX_FEATURE_WINDOWS", "3,6,12")
+FEATURE_LAGS = _parse_lengths("SENSEX_FEATURE_LAGS", "1,3")
+# A window whose std is below this fraction of its mean's magnitude counts as flat
+FLAT_TOLERANCE = 1e-9
+
+
+def window_moments(x, window=None):
+    # Mean and population variance of the trailing `window` rows at every row
+    # (expanding from the first row when window is None)
+    if window is not None and window < 1:
+        raise ValueError(f"window must be >= 1, got {window}")
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n == 0:
+        return x.copy(), x.copy()
+    count = np.arange(1, n + 1)
+    mean = np.cumsum(x - x[0]) / count + x[0]
+    previous = np.concatenate(([x[0]], mean[:-1]))
+    var = np.maximum(np.cumsum((x - previous) * (x - mean)) / count, 0.0)
+    if window is not None and window < n:
+        # Rows before the first full window are expanding windows; the rest use their own rows
+        m = n - window + 1
+        slices = [x[k:k + m] for k in range(window)]
+        full = sum(slices) / window
+        mean[window - 1:] = full
+        var[window - 1:] = sum((part - full) ** 2 for part in slices) / window
+    return mean, var
+
+
+def rolling_mean(x, window):
+    return window_moments(x, window)[0]
+
+
+def zscore(x, window=None):
+    # Each row against the mean and std of its trailing window (or of every row up to it)
+    mean, var = window_moments(x, window)
+    return _z_from_moments(x, mean, var)
+
+
+def lag(x, k):
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+class FeatureMatrix:
+    # Named float64 columns in one read-only column-major block, like the forecaster's own state
+    __slots__ = ("names", "values", "_index")
+
+    def __init__(self, names, values):
+        self.names = list(names)
+        self.values = values
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def column(self, name):
+        return self.values[:, self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+
+def feature_names(columns, windows=FEATURE_WINDOWS, lags=FEATURE_LAGS):
+    names = []
+    for col in columns:
+        names.append(f"{col}_Z")
+        for w in windows:
+            names += [f"{col}_MEAN{w}", f"{col}_Z{w}"]
+        names += [f"{col}_LAG{k}" for k in lags]
+    return names
+
+
+def build_feature_matrix(columns, windows=FEATURE_WINDOWS, lags=FEATURE_LAGS):
+    # columns: {name: 1-d array}, all the same length
+    n = len(next(iter(columns.values()))) if columns else 0
+    names = feature_names(columns, windows, lags)
+    values = np.empty((n, len(names)), order="F")
+    i = 0
+    for x in columns.values():
+        values[:, i] = zscore(x)
+        i += 1
+        for w in windows:
+            mean, var = window_moments(x, w)
+            values[:, i] = mean
+            values[:, i + 1] = _z_from_moments(x, mean, var)
+            i += 2
+        for k in lags:
+            values[:, i] = lag(x, k)
+            i += 1
+    values.flags.writeable = False
+    return FeatureMatrix(names, values)
+
+
+def _z_from_moments(x, mean, var):
+    std = np.sqrt(var)
+    flat = std <= FLAT_TOLERANCE * np.maximum(np.abs(mean), 1.0)
+    return np.where(flat, 0.0, (np.asarray(x, dtype=float) - mean) / np.where(flat, 1.0, std))
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Import-time budget for the API process.
+# Every replica spawn and every reload=True restart pays for `import server` before uvicorn can
+# bind, so this measures it in fresh interpreters and fails when it exceeds the budget or when
+# a module that should be deferred (plotting, model loading) sneaks back into the import path.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_BUDGET_MS = 1500
+# Only needed once the forecaster is built or a plot is saved
+DEFERRED_MODULES = ["matplotlib", "sklearn", "joblib"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import server
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+    "built": bool(sys.modules["sensex_macro_forecast_all_horizons"].registry.loaded()),
+}))
+"""
+
+
+def measure(runs=5):
+    samples, loaded, built = [], set(), False
+    env = dict(os.environ, SENSEX_EAGER_LOAD="0")
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE % DEFERRED_MODULES],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded.update(result["loaded"])
+        built = built or result["built"]
+    return min(samples), sorted(loaded), built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget of server.py")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ.get("SENSEX_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    best_ms, loaded, built = measure(args.runs)
+    print(f"import server: {best_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if best_ms > args.budget_ms:
+        failures.append(f"import time {best_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if loaded:
+        failures.append(f"deferred modules imported eagerly: {', '.join(loaded)}")
+    if built:
+        failures.append("forecaster was constructed at import time")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
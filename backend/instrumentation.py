@@ -0,0 +1,151 @@
+import cProfile
+import hmac
+import io
+import pstats
+import time
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from metrics import REQUEST_SECONDS, REQUESTS_TOTAL, RESPONSE_BYTES
+
+# Request instrumentation for the API: an ASGI middleware that records latency, request counts
+# and response sizes per route, plus an opt-in per-request cProfile summary.
+#
+# Profiling is requested with an `X-Profile: 1` header or a `profile=1` query flag and is only
+# honoured when enabled at startup and the request carries the admin token (without a configured
+# token nobody may profile). The event-loop side of the request is profiled directly;
+# work offloaded with run_cpu is profiled in its worker thread through `profiled()` and merged
+# into the same report. Other requests running concurrently on the loop can show up in it.
+
+PROFILE_LINES = 40
+
+_active_profiles = ContextVar("sensex_active_profiles", default=None)
+
+
+def profiled(fn):
+    # Wrap fn so it is profiled in whichever thread runs it when the current request is profiled
+    profiles = _active_profiles.get()
+    if profiles is None:
+        return fn
+
+    def run(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; run unprofiled instead
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiles.append(profiler)
+    return run
+
+
+def _profile_requested(scope):
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile" and value not in (b"", b"0", b"false"):
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("profile", ["0"])[-1] not in ("", "0", "false")
+
+
+def admin_token_matches(token, admin_token):
+    # Constant-time check of a presented X-Admin-Token; False when no token is configured
+    return bool(admin_token) and token is not None and hmac.compare_digest(token, admin_token)
+
+
+def _header(scope, wanted):
+    for name, value in scope.get("headers", []):
+        if name == wanted:
+            return value.decode("latin-1")
+    return None
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app, profiling_enabled=False, admin_token=None):
+        self.app = app
+        self.profiling_enabled = profiling_enabled
+        self.admin_token = admin_token
+
+    def _may_profile(self, scope):
+        if not self.profiling_enabled or not _profile_requested(scope):
+            return False
+        return admin_token_matches(_header(scope, b"x-admin-token"), self.admin_token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._may_profile(scope):
+            await self._profile(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method, status = scope["method"], str(state["status"])
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method, route, status)
+            REQUESTS_TOTAL.inc(method, route, status)
+            RESPONSE_BYTES.observe(state["bytes"], method, route)
+
+    async def _profile(self, scope, receive, send):
+        # Run the request under cProfile, swallow its response and answer with the report
+        profiles = []
+        token = _active_profiles.set(profiles)
+        status = {"code": 500}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _active_profiles.reset(token)
+        elapsed = time.perf_counter() - started
+
+        out = io.StringIO()
+        sources = ([profiler] if profiler is not None else []) + profiles
+        if sources:
+            stats = pstats.Stats(sources[0], stream=out)
+            for extra in sources[1:]:
+                stats.add(extra)
+            stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+        else:
+            out.write("profiler unavailable: another profiling tool is active\n")
+
+        body = f"{scope['method']} {scope['path']} -> {status['code']} in {elapsed * 1000:.2f} ms\n\n".encode()
+        body += out.getvalue().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(status["code"]).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
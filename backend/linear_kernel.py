@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Request-time model arithmetic without scikit-learn.
+# The served models are a StandardScaler, a binary LogisticRegression over the 8 FEATURES and
+# a 3-coefficient return regression. At request time that is a subtract, a divide, one dot
+# product and a logistic, which sklearn wraps in per-call input validation that costs far
+# more than the math. The exporter below flattens scaler.pkl and bullish_model.pkl (plus the
+# return regression fitted on the sheet, for reference) into a JSON coefficient bundle,
+# verified against sklearn before it is written. The forecaster serves from the bundle when
+# one is present, so the API process imports neither sklearn nor joblib.
+#
+#   python linear_kernel.py                     # export ../data/model_bundle.json
+#   python linear_kernel.py --check             # only compare the kernel with sklearn
+
+BUNDLE_FORMAT = 1
+# Largest absolute probability difference from sklearn that export accepts
+DEFAULT_TOLERANCE = 1e-12
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def standard_scores(x):
+    # StandardScaler().fit_transform for one column: population std with the two-pass
+    # corrected variance sklearn uses, and near-constant columns left unscaled
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    mean = x.sum() / n
+    dev = x - mean
+    var = ((dev ** 2).sum() - dev.sum() ** 2 / n) / n
+    scale = np.sqrt(var)
+    if scale < 10 * np.finfo(float).eps:
+        scale = 1.0
+    return (x - mean) / scale
+
+
+class ReturnModel:
+    # Fitted linear regression: expected return = intercept + X @ coef
+    __slots__ = ("intercept", "coef")
+
+    def __init__(self, intercept, coef):
+        self.intercept = float(intercept)
+        self.coef = np.asarray(coef, dtype=float)
+
+    @classmethod
+    def fit(cls, X, y):
+        # Ordinary least squares with an intercept, solved like LinearRegression: centre X and
+        # y, least-squares on the centred design, intercept from the means
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        x_mean = X.mean(axis=0)
+        y_mean = y.mean()
+        coef = np.linalg.lstsq(X - x_mean, y - y_mean, rcond=None)[0]
+        return cls(y_mean - x_mean @ coef, coef)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef + self.intercept
+
+    def to_bundle(self):
+        return {"intercept": self.intercept, "coef": self.coef.tolist()}
+
+
+class LinearKernel:
+    # StandardScaler followed by a binary logistic regression, as flat arrays
+    __slots__ = ("features", "mean", "scale", "coef", "intercept")
+
+    def __init__(self, features, mean, scale, coef, intercept):
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_estimators(cls, scaler, model, features):
+        if len(model.classes_) != 2:
+            raise ValueError("only binary logistic models can be exported")
+        return cls(features, scaler.mean_, scaler.scale_, model.coef_[0], model.intercept_[0])
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        if bundle.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"unsupported model bundle format {bundle.get('format')!r}")
+        scaler, model = bundle["scaler"], bundle["bullish_model"]
+        return cls(bundle["features"], scaler["mean"], scaler["scale"], model["coef"], model["intercept"])
+
+    def decision(self, X):
+        # Log-odds of the bullish class for an (n, 8) matrix (or one row of 8)
+        return ((np.asarray(X, dtype=float) - self.mean) / self.scale) @ self.coef + self.intercept
+
+    def probability(self, X):
+        return 1.0 / (1.0 + np.exp(-self.decision(X)))
+
+    def to_bundle(self):
+        return {
+            "features": self.features,
+            "scaler": {"mean": self.mean.tolist(), "scale": self.scale.tolist()},
+            "bullish_model": {"coef": self.coef.tolist(), "intercept": self.intercept},
+        }
+
+
+def save_bundle(path, kernel, ret_model=None, sources=None):
+    # sources: {"model": path, "scaler": path}; their digests let loaders spot a stale bundle
+    bundle = {"format": BUNDLE_FORMAT, **kernel.to_bundle()}
+    if ret_model is not None:
+        bundle["return_model"] = ret_model.to_bundle()
+    if sources:
+        bundle["sources"] = {key: file_digest(p) for key, p in sources.items()}
+    bundle["exported_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(bundle, f, indent=2)
+    os.replace(tmp_path, path)
+    return bundle
+
+
+def load_bundle(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def bundle_is_current(bundle, sources):
+    # False when a pickle the bundle was exported from exists and has changed since.
+    # Missing pickles are fine: a deployment may ship the bundle alone.
+    recorded = bundle.get("sources", {})
+    for key, path in sources.items():
+        if key in recorded and os.path.exists(path) and file_digest(path) != recorded[key]:
+            return False
+    return True
+
+
+def compare_with_sklearn(kernel, scaler, model, X, ret_model=None, X_ret=None, y_ret=None):
+    # Largest absolute differences between the kernel and sklearn on the same inputs
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    frame = pd.DataFrame(X, columns=kernel.features)
+    report = {
+        "probability": float(np.abs(
+            kernel.probability(X) - model.predict_proba(scaler.transform(frame))[:, 1]).max()),
+        "decision": float(np.abs(
+            kernel.decision(X) - model.decision_function(scaler.transform(frame))).max()),
+    }
+    if ret_model is not None:
+        reference = LinearRegression().fit(X_ret, y_ret)
+        report["return_model"] = float(max(
+            abs(ret_model.intercept - reference.intercept_),
+            np.abs(ret_model.coef - reference.coef_).max(),
+            np.abs(ret_model.predict(X_ret) - reference.predict(X_ret)).max(),
+        ))
+    return report
+
+
+def main():
+    from sensex_macro_forecast_all_horizons import (
+        BULLISH_MODEL_PATH, SCALER_PATH, MODEL_DATA_PATH, MODEL_BUNDLE_PATH, FEATURES,
+        load_model_data, load_model_file, add_shock_features, return_model_inputs,
+    )
+
+    parser = argparse.ArgumentParser(description="Export the scaler and models to a coefficient bundle")
+    parser.add_argument("--data", default=MODEL_DATA_PATH, help="sheet used to verify and to fit the return model")
+    parser.add_argument("--model", default=BULLISH_MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--out", default=MODEL_BUNDLE_PATH)
+    parser.add_argument("--samples", type=int, default=10000,
+                        help="random rows checked on top of the sheet's own rows")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--check", action="store_true", help="verify only; do not write the bundle")
+    args = parser.parse_args()
+
+    scaler = load_model_file(args.scaler)
+    model = load_model_file(args.model)
+    kernel = LinearKernel.from_estimators(scaler, model, FEATURES)
+
+    df = load_model_data(args.data)
+    X = df[FEATURES].to_numpy(dtype=float)
+    # The sheet's rows plus draws well outside them, so saturated probabilities are covered too
+    rng = np.random.default_rng(0)
+    spread = X.std(axis=0) * 4
+    X = np.vstack([X, X.mean(axis=0) + spread * rng.standard_normal((args.samples, X.shape[1]))])
+
+    df["BULLISH_PROBABILITY"] = kernel.probability(df[FEATURES].to_numpy(dtype=float))
+    add_shock_features(df)
+    X_ret = return_model_inputs(df).to_numpy()
+    ret_model = ReturnModel.fit(X_ret, df["SENSEX_RETURN"].to_numpy())
+
+    report = compare_with_sklearn(kernel, scaler, model, X, ret_model, X_ret, df["SENSEX_RETURN"].to_numpy())
+    for name, diff in report.items():
+        print(f"{name:<14} max |kernel - sklearn| = {diff:.3e}")
+    if max(report.values()) > args.tolerance:
+        sys.exit(f"kernel differs from sklearn by more than {args.tolerance:g}; bundle not written")
+    if args.check:
+        return
+    save_bundle(args.out, kernel, ret_model, {"model": args.model, "scaler": args.scaler})
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal in-process metrics with Prometheus text exposition (served at /metrics).
+# Standard library only, so the forecaster module can time its stages without pulling in
+# a client library. Counters, gauges and histograms are keyed by label values and thread-safe.
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Gauge(Counter):
+    # A value that goes up and down (e.g. open connections)
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, total, n) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = _format_labels(self.labels, values, [("le", repr(float(bound)))])
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                inf = _format_labels(self.labels, values, [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{inf} {n}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {n}")
+        return lines
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+STAGE_SECONDS = Histogram(
+    "sensex_stage_seconds", "Time spent in forecaster and serialization stages",
+    labels=("stage",), buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "sensex_http_request_seconds", "HTTP request latency by route",
+    labels=("method", "route", "status"), buckets=LATENCY_BUCKETS,
+)
+REQUESTS_TOTAL = Counter(
+    "sensex_http_requests_total", "HTTP requests by route",
+    labels=("method", "route", "status"),
+)
+RESPONSE_BYTES = Histogram(
+    "sensex_http_response_bytes", "HTTP response body size by route",
+    labels=("method", "route"), buckets=BYTES_BUCKETS,
+)
+
+FORECASTER_EVICTIONS = Counter(
+    "sensex_forecaster_evictions_total", "Forecasters evicted from the index registry under the memory budget",
+    labels=("index",),
+)
+
+STREAM_CLIENTS = Gauge(
+    "sensex_stream_clients", "Open /api/stream connections", labels=("index",),
+)
+STREAM_EVENTS = Counter(
+    "sensex_stream_events_total", "Snapshot and patch events sent on /api/stream", labels=("index", "event"),
+)
+
+REGISTRY = [
+    STAGE_SECONDS, REQUEST_SECONDS, REQUESTS_TOTAL, RESPONSE_BYTES, FORECASTER_EVICTIONS,
+    STREAM_CLIENTS, STREAM_EVENTS,
+]
+
+
+@contextmanager
+def span(stage):
+    # Time a named stage into sensex_stage_seconds
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,151 +1,34 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import joblib
-
-# ==============================
-
-# ==============================
-# 1. LOAD DATA
-# ==============================
 import os
 import sys
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "..", "data")
-OUTPUT_DIR = os.path.join(BASE_DIR, "..", "outputs")
-
-df = pd.read_csv(os.path.join(DATA_DIR, "model_file_withclosesensex(Sheet1).csv"))
-
-# Standardize column names
-df.columns = df.columns.str.strip().str.upper().str.replace(" ", "_")
-
-print("Columns loaded:", df.columns.tolist())
-
-# ==============================
-# 2. CLEAN NUMERIC DATA
-# ==============================
-numeric_cols = [
-    "GST_YOY_LAG1",
-    "IIP_GROWTH_LAG1",
-    "ECI_GROWTH_LAG1",
-    "REPO_LAG1",
-    "USDINR_CHANGE_LAG1",
-    "CRUDE_CHANGE",
-    "GOLD_CHANGE",
-    "FPI_LAG1",
-    "SENSEX_RETURN",
-    "CLOSE_SENSEX"
-]
-
-for col in numeric_cols:
-    df[col] = df[col].astype(str).str.replace(",", "").astype(float)
-
-print("Numeric columns cleaned")
-
-# ==============================
-# 3. LOAD MODEL & SCALER (PKL)
-# ==============================
-model = joblib.load(os.path.join(DATA_DIR, "bullish_model.pkl"))
-scaler = joblib.load(os.path.join(DATA_DIR, "scaler.pkl"))
-
-print("Model and scaler loaded successfully")
-
-# ==============================
-# 4. DEFINE FEATURES
-# ==============================
-features = [
-    "GST_YOY_LAG1",
-    "IIP_GROWTH_LAG1",
-    "ECI_GROWTH_LAG1",
-    "REPO_LAG1",
-    "USDINR_CHANGE_LAG1",
-    "CRUDE_CHANGE",
-    "GOLD_CHANGE",
-    "FPI_LAG1"
-]
-
-X = df[features]
-X_scaled = scaler.transform(X)
-
-# ==============================
-# 5. BULLISH PROBABILITY
-# ==============================
-df["BULLISH_PROBABILITY"] = model.predict_proba(X_scaled)[:, 1]
-
-print("Bullish probability calculated")
-
-# ==============================
-# 6. EXPECTED RETURN
-# ==============================
-avg_pos = df[df["SENSEX_RETURN"] > 0]["SENSEX_RETURN"].mean()
-avg_neg = df[df["SENSEX_RETURN"] < 0]["SENSEX_RETURN"].mean()
-
-df["EXPECTED_RETURN"] = (
-    df["BULLISH_PROBABILITY"] * avg_pos +
-    (1 - df["BULLISH_PROBABILITY"]) * avg_neg
-)
-
-print("Expected return calculated")
-
-# ==============================
-# 7. EXPECTED SENSEX
-# ==============================
-df["EXPECTED_SENSEX"] = (
-    df["CLOSE_SENSEX"].iloc[0] *
-    (1 + df["EXPECTED_RETURN"]).cumprod()
-)
+from regime_engine import REGIME_NAMES, classify
+from report_builder import write_history
+from sensex_macro_forecast_all_horizons import MODEL_DATA_PATH, OUTPUT_DIR, SensexForecaster
 
-print("Expected Sensex generated")
+# Actual vs macro-driven expected Sensex for a single sheet.
+# The chart and CSV come from report_builder.py (its "macro" artifact), which is also what
+# the nightly report build publishes; this script only renders them for one sheet outside a
+# versioned build and prints the latest macro signal. Any sheet in the model_with_vix schema
+# can be passed, e.g. one from synthetic_data.py:
+#   python output.py ../data/synthetic.csv
 
-# ==============================
-# 8. COEFFICIENT INTERPRETATION
-# ==============================
-coef_df = pd.DataFrame({
-    "FEATURE": features,
-    "COEFFICIENT": model.coef_[0]
-}).sort_values("COEFFICIENT", ascending=False)
-
-print("\nMacro Variable Importance (Logistic Coefficients):")
-print(coef_df)
-
-print("\nModel Intercept:", model.intercept_[0])
-
-# ==============================
-# 9. PLOT ACTUAL VS EXPECTED
-# ==============================
-plt.figure(figsize=(12, 6))
-plt.plot(df["YEAR"], df["CLOSE_SENSEX"], label="Actual Sensex")
-plt.plot(df["YEAR"], df["EXPECTED_SENSEX"], "--", label="Macro Expected Sensex")
-plt.legend()
-plt.title("Actual vs Macro-Driven Expected Sensex")
-plt.grid(True)
-plt.savefig(os.path.join(OUTPUT_DIR, "sensex_projection7.png"), dpi=300)
-plt.close()
+SHEET_PATH = sys.argv[1] if len(sys.argv) > 1 else MODEL_DATA_PATH
 
+forecaster = SensexForecaster(SHEET_PATH)
+write_history(forecaster, "macro", os.path.join(OUTPUT_DIR, "sensex_projection7.png"),
+              os.path.join(OUTPUT_DIR, "sensex_model_output.csv"), "BSE Sensex")
 print("Plot saved as sensex_projection7.png")
-
-# ==============================
-# 10. SAVE FINAL OUTPUT
-# ==============================
-df.to_csv(os.path.join(OUTPUT_DIR, "sensex_model_output.csv"), index=False)
 print("Final output saved as sensex_model_output.csv")
 
 # ==============================
-# 11. LATEST SIGNAL (LIVE INTERPRETATION)
+# LATEST SIGNAL (LIVE INTERPRETATION)
 # ==============================
-latest_prob = df["BULLISH_PROBABILITY"].iloc[-1]
-latest_return = df["EXPECTED_RETURN"].iloc[-1]
+# Expected_Return = Prob * avg_pos + (1-Prob) * avg_neg, as in the macro expected history
+returns = forecaster.column("SENSEX_RETURN")
+latest_prob = forecaster.column("BULLISH_PROBABILITY")[-1]
+latest_return = latest_prob * returns[returns > 0].mean() + (1 - latest_prob) * returns[returns < 0].mean()
 
 print("\n===== CURRENT MACRO SIGNAL =====")
 print("Latest Bullish Probability:", round(latest_prob, 2))
 print("Latest Expected Return:", round(latest_return * 100, 2), "%")
-
-if latest_prob >= 0.65:
-    print("Macro Regime: STRONGLY BULLISH")
-elif latest_prob >= 0.55:
-    print("Macro Regime: MILDLY BULLISH")
-elif latest_prob >= 0.45:
-    print("Macro Regime: NEUTRAL")
-else:
-    print("Macro Regime: BEARISH")
+print("Macro Regime:", REGIME_NAMES[classify(latest_prob)])
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Shared compounding engine for every level path in the backend.
+# All functions work on a matrix of return series (one row per scenario / horizon)
+# and build every path in a single NumPy call instead of a per-month Python loop.
+
+def compound_paths(start, returns):
+    # start: scalar or one starting level per row
+    # returns: (n_paths, horizon) matrix of per-period returns (a 1-D series is treated as one row)
+    # Returns an (n_paths, horizon) matrix where column t is the level after period t
+    returns = np.asarray(returns, dtype=float)
+    single = returns.ndim == 1
+    returns = np.atleast_2d(returns)
+
+    start = np.broadcast_to(np.asarray(start, dtype=float), (returns.shape[0],))
+
+    # Seed the product with the starting level so the multiplication order matches
+    # the level-by-level recursion: ((start * (1 + r0)) * (1 + r1)) ...
+    growth = np.empty((returns.shape[0], returns.shape[1] + 1))
+    growth[:, 0] = start
+    np.add(returns, 1.0, out=growth[:, 1:])
+    paths = np.cumprod(growth, axis=1)[:, 1:]
+
+    return paths[0] if single else paths
+
+
+def constant_rate_paths(start, rates, horizon):
+    # Closed form for a constant rate per row: level_t = start * (1 + r) ** t
+    # rates: scalar or one rate per row; returns an (n_rates, horizon) matrix
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    start = np.broadcast_to(np.asarray(start, dtype=float), rates.shape)
+
+    steps = np.arange(1, horizon + 1)
+    return start[:, None] * np.power(1.0 + rates[:, None], steps[None, :])
+
+
+def simulate_paths(start, drift, shocks):
+    # Monte Carlo paths: each row compounds the constant drift plus its own shock series
+    # shocks: (n_paths, horizon) matrix of return innovations drawn by the caller
+    return compound_paths(start, drift + np.asarray(shocks, dtype=float))
+
+
+def simulate_scenario_paths(start, drifts, shocks):
+    # The same (n_paths, horizon) shock draws compounded around several drifts at once
+    # Returns an (n_drifts, n_paths, horizon) array
+    drifts = np.atleast_1d(np.asarray(drifts, dtype=float))
+    shocks = np.asarray(shocks, dtype=float)
+    returns = drifts[:, None, None] + shocks[None, :, :]
+    paths = compound_paths(start, returns.reshape(-1, shocks.shape[1]))
+    return paths.reshape(returns.shape)
+
+
+def percentile_bands(paths, percentiles, axis=0):
+    # Cross-sectional percentiles over the path axis; returns {percentile: array}
+    values = np.percentile(paths, percentiles, axis=axis)
+    return dict(zip(percentiles, values))
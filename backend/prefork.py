@@ -0,0 +1,247 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing import shared_memory
+
+# Pre-fork production serving.
+# The parent process builds the forecasters once, moves their row blocks and residuals into
+# POSIX shared memory, binds the listening socket and then forks N uvicorn workers. Workers
+# inherit the read-only mappings and the already-built registry, so adding a worker costs
+# neither another model load nor another copy of the data.
+#
+#   python prefork.py --workers 4 --port 8000 [--indices sensex,nifty]
+#
+# Because every worker serves the parent's snapshot, model updates go through the parent:
+# SIGHUP (or POST /api/admin/reload from any worker) rebuilds the state once and replaces
+# the workers one by one; incremental /api/ingest is refused in this mode. Metrics and the
+# response cache are per worker. POSIX only (needs os.fork).
+
+# Seconds to wait before respawning a worker that exited on its own
+RESPAWN_DELAY = 1.0
+# Seconds old workers get to finish in-flight requests during a rolling reload or shutdown
+GRACEFUL_TIMEOUT = 30.0
+
+
+class SharedState:
+    # Shared-memory segments backing the exported forecasters of one generation
+    def __init__(self):
+        self.segments = []
+
+    def allocate(self, nbytes):
+        segment = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self.segments.append(segment)
+        return segment.buf
+
+    def release(self):
+        # Drop the names; workers that still map a segment keep it until they exit
+        for segment in self.segments:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                segment.close()
+            except BufferError:
+                # Still viewed by a forecaster in this process; freed with it
+                pass
+        self.segments = []
+
+    @property
+    def nbytes(self):
+        return sum(segment.size for segment in self.segments)
+
+
+def export_indices(indices, reload=False):
+    # Build (or rebuild) every index in this process and move its arrays into shared memory
+    from sensex_macro_forecast_all_horizons import registry
+
+    state = SharedState()
+    for index in indices:
+        forecaster = registry.reload(index) if reload else registry.get(index)
+        forecaster.rehome(state.allocate)
+    # Keep the collector from touching (and so copying) the inherited objects in the workers
+    gc.collect()
+    gc.freeze()
+    return state
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, log_level):
+    # Child side: serve the inherited app on the inherited socket until told to stop
+    import uvicorn
+    import server
+
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    config = uvicorn.Config(server.app, lifespan="on", log_level=log_level,
+                            timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock, workers, indices, log_level="info", watch_interval=0.0):
+        self.sock = sock
+        self.n_workers = workers
+        self.indices = indices
+        self.log_level = log_level
+        self.watch_interval = watch_interval
+        self.workers = set()
+        self.state = None
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.sock, self.log_level)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers.add(pid)
+        return pid
+
+    def stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+                    self.workers.discard(pid)
+            time.sleep(0.05)
+        for pid in pending:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.workers.discard(pid)
+
+    def rolling_reload(self):
+        # New state first; if the rebuild fails the current workers keep serving
+        started = time.perf_counter()
+        try:
+            state = export_indices(self.indices, reload=True)
+        except Exception as exc:
+            print(f"[prefork] reload failed, keeping the current model: {exc}", flush=True)
+            return
+        old_state, self.state = self.state, state
+        # Replace workers one at a time so capacity never drops by more than one
+        for old in list(self.workers):
+            self.spawn()
+            self.stop_workers([old])
+        old_state.release()
+        print(f"[prefork] reloaded {', '.join(self.indices)} in {time.perf_counter() - started:.2f}s", flush=True)
+
+    def _sources_changed(self, seen):
+        from sensex_macro_forecast_all_horizons import registry, source_fingerprint
+
+        changed = False
+        for index in self.indices:
+            forecaster = registry.peek(index)
+            try:
+                fingerprint = source_fingerprint(forecaster.sources)
+            except OSError:
+                continue
+            if fingerprint != seen.get(index, forecaster.version["fingerprint"]):
+                seen[index] = fingerprint
+                changed = True
+        return changed
+
+    def run(self):
+        import server
+
+        started = time.perf_counter()
+        self.state = export_indices(self.indices)
+        print(f"[prefork] loaded {', '.join(self.indices)} in {time.perf_counter() - started:.2f}s, "
+              f"{self.state.nbytes / 2**20:.1f} MiB shared", flush=True)
+
+        # Workers forward admin reloads here instead of rebuilding privately
+        server.PREFORK_PARENT = os.getpid()
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "reload_requested", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "stopping", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "stopping", True))
+
+        for _ in range(self.n_workers):
+            self.spawn()
+
+        seen, next_watch = {}, time.monotonic() + self.watch_interval
+        try:
+            while not self.stopping:
+                if self.watch_interval > 0 and time.monotonic() >= next_watch:
+                    next_watch = time.monotonic() + self.watch_interval
+                    if self._sources_changed(seen):
+                        self.reload_requested = True
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.rolling_reload()
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    pid = 0
+                if pid and pid in self.workers:
+                    self.workers.discard(pid)
+                    print(f"[prefork] worker {pid} exited ({status}); respawning", flush=True)
+                    time.sleep(RESPAWN_DELAY)
+                    if not self.stopping:
+                        self.spawn()
+                time.sleep(0.2)
+        finally:
+            self.stop_workers(list(self.workers))
+            self.state.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from N pre-forked workers sharing one model load")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--indices", default=None,
+                        help="comma-separated indices to preload and share (default: the default index)")
+    parser.add_argument("--watch-interval", type=float,
+                        default=float(os.environ.get("SENSEX_WATCH_INTERVAL", "0")),
+                        help="poll the model files every N seconds and reload on change (0 = off)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("prefork.py needs os.fork; use `python server.py` on this platform")
+
+    # The parent builds everything before forking; workers must not start their own load
+    os.environ["SENSEX_EAGER_LOAD"] = "0"
+    from sensex_macro_forecast_all_horizons import DEFAULT_INDEX, registry
+
+    indices = args.indices.split(",") if args.indices else [DEFAULT_INDEX]
+    unknown = [index for index in indices if not registry.known(index)]
+    if unknown:
+        sys.exit(f"unknown index: {', '.join(unknown)}")
+
+    sock = bind_socket(args.host, args.port)
+    Supervisor(sock, args.workers, indices, args.log_level, args.watch_interval).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import numpy as np
+
+# Regime-switching forecast mode.
+# Every month is put in a macro regime by its BULLISH_PROBABILITY, using the cut-offs that
+# output.py prints regimes with. The history then gives a first-order Markov transition
+# matrix P between regimes, plus the mean and variance of the Sensex return in each regime.
+# Starting from the latest month's regime, everything a forecast needs is a matrix power,
+# so nothing is simulated:
+#
+#   regime probabilities h months ahead   e_now @ P^h
+#   expected growth E[prod(1 + r)]        e_now @ (P @ diag(1 + mean))^h @ 1
+#   second moment E[prod(1 + r)^2]        e_now @ (P @ diag((1 + mean)^2 + var))^h @ 1
+#
+# The last two are exact when a month's return depends only on that month's regime, and they
+# give the expected level and its standard deviation. The n-step matrices of all three
+# chains are precomputed for every horizon up to MAX_REGIME_HORIZON when the model is fitted.
+
+REGIME_NAMES = ("BEARISH", "NEUTRAL", "MILDLY BULLISH", "STRONGLY BULLISH")
+# BULLISH_PROBABILITY at which each regime after the first starts
+REGIME_CUTOFFS = (0.45, 0.55, 0.65)
+# Longest horizon with precomputed n-step matrices (longer ones are computed on request)
+MAX_REGIME_HORIZON = 120
+
+
+def classify(prob, cutoffs=REGIME_CUTOFFS):
+    # Regime number of every probability: 0 below the first cut-off, len(cutoffs) above the last
+    return np.searchsorted(cutoffs, np.asarray(prob, dtype=float), side="right")
+
+
+def transition_counts(states, k):
+    # (k, k) counts of month-to-month moves from regime i to regime j
+    states = np.asarray(states)
+    return np.bincount(states[:-1] * k + states[1:], minlength=k * k).reshape(k, k).astype(float)
+
+
+def matrix_powers(M, horizon):
+    # M^1 ... M^horizon as one (horizon, k, k) stack
+    powers = np.empty((horizon,) + M.shape)
+    powers[0] = M
+    for h in range(1, horizon):
+        powers[h] = powers[h - 1] @ M
+    return powers
+
+
+class RegimeModel:
+    __slots__ = (
+        "names", "cutoffs", "counts", "transition", "mean", "var", "months", "current",
+        "_growth", "_second", "_powers",
+    )
+
+    def __init__(self, transition, mean, var, current, counts=None, months=None,
+                 names=REGIME_NAMES, cutoffs=REGIME_CUTOFFS, horizon=MAX_REGIME_HORIZON):
+        self.names = tuple(names)
+        self.cutoffs = tuple(cutoffs)
+        self.transition = np.asarray(transition, dtype=float)
+        self.mean = np.asarray(mean, dtype=float)
+        self.var = np.asarray(var, dtype=float)
+        self.current = int(current)
+        k = len(self.names)
+        self.counts = np.zeros((k, k)) if counts is None else counts
+        self.months = np.zeros(k, dtype=int) if months is None else months
+        self._growth = self.transition * (1 + self.mean)
+        self._second = self.transition * ((1 + self.mean) ** 2 + self.var)
+        self._powers = self._stacks(horizon)
+
+    @classmethod
+    def fit(cls, prob, returns, cutoffs=REGIME_CUTOFFS, names=REGIME_NAMES, horizon=MAX_REGIME_HORIZON):
+        states = classify(prob, cutoffs)
+        returns = np.asarray(returns, dtype=float)
+        k = len(names)
+        counts = transition_counts(states, k)
+        months = np.bincount(states, minlength=k)
+        # A regime with no outgoing transitions (never seen, or seen only in the last month)
+        # moves like the history as a whole rather than having an empty row
+        totals = counts.sum(axis=1, keepdims=True)
+        frequency = months / len(states)
+        transition = np.where(totals > 0, counts / np.where(totals > 0, totals, 1.0), frequency)
+        # Regimes without months take the overall return distribution
+        seen = months > 0
+        sums = np.bincount(states, weights=returns, minlength=k)
+        mean = np.where(seen, sums / np.maximum(months, 1), returns.mean())
+        squares = np.bincount(states, weights=(returns - mean[states]) ** 2, minlength=k)
+        var = np.where(seen, squares / np.maximum(months, 1), returns.var())
+        return cls(transition, mean, var, states[-1], counts, months, names, cutoffs, horizon)
+
+    @property
+    def nbytes(self):
+        # Dominated by the precomputed (3, MAX_REGIME_HORIZON, k, k) power stack
+        arrays = (self.counts, self.transition, self.mean, self.var, self.months,
+                  self._growth, self._second, self._powers)
+        return sum(np.asarray(array).nbytes for array in arrays)
+
+    def _stacks(self, horizon):
+        # n-step matrices of the regime chain and of the two growth chains, (3, horizon, k, k)
+        return np.stack([matrix_powers(M, horizon) for M in (self.transition, self._growth, self._second)])
+
+    def n_step(self, horizon):
+        return self._powers_for(horizon)[0, horizon - 1]
+
+    def _powers_for(self, horizon):
+        powers = self._powers
+        return powers if horizon <= powers.shape[1] else self._stacks(horizon)
+
+    def stationary(self):
+        # Long-run regime probabilities: pi @ P = pi with sum(pi) = 1
+        k = len(self.names)
+        A = np.vstack([self.transition.T - np.eye(k), np.ones(k)])
+        b = np.append(np.zeros(k), 1.0)
+        return np.linalg.lstsq(A, b, rcond=None)[0]
+
+    def forecast(self, level, horizon):
+        # Regime-probability path and level moments for months 1..horizon
+        powers = self._powers_for(horizon)[:, :horizon, self.current, :]
+        probabilities = powers[0]
+        growth = powers[1].sum(axis=1)
+        second = powers[2].sum(axis=1)
+        return {
+            "probabilities": probabilities,
+            "expected_return": probabilities @ self.mean,
+            "expected_level": level * growth,
+            "level_std": level * np.sqrt(np.maximum(second - growth ** 2, 0.0)),
+        }
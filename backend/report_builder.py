@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Batch report build for the nightly publication.
+# Renders every index x horizon x scenario forecast chart and CSV, plus each index's
+# VIX-adjusted and macro expected-vs-actual history charts and CSVs, in a process pool. Charts are drawn on standalone
+# matplotlib Figures (Agg canvas), so no GUI backend or pyplot state is involved.
+#
+# Every artifact has a fingerprint of its inputs: the index's source files (data sheet,
+# pickles, coefficient bundle), the horizon/scenario, the band settings and RENDER_VERSION.
+# A build goes to outputs/reports/<version>/, where <version> is a hash of all of them, and
+# outputs/reports/latest.json names the newest one. Artifacts whose fingerprint matches the
+# previous build are hard-linked from it instead of being rendered again, and a build whose
+# inputs are all unchanged does nothing.
+#
+#   python report_builder.py                      # every configured index
+#   python report_builder.py --indices sensex --horizons 6,12 --workers 4
+
+from sensex_macro_forecast_all_horizons import (
+    FORECAST_HORIZONS, SCENARIO_MULTS, BAND_PERCENTILES, OUTPUT_DIR,
+    load_index_config, model_sources, source_fingerprint,
+)
+
+REPORTS_DIR = os.path.join(OUTPUT_DIR, "reports")
+# Bump when chart or CSV layout changes so every artifact is rebuilt
+RENDER_VERSION = 1
+DEFAULT_N_PATHS = 10000
+DEFAULT_SEED = 42
+
+
+def plan(indices, horizons, scenarios, n_paths=DEFAULT_N_PATHS, seed=DEFAULT_SEED, dpi=300):
+    # One job per artifact pair (chart + CSV), each with the fingerprint of its inputs
+    config = load_index_config()
+    jobs = []
+    for index in indices:
+        spec = config[index]
+        sources = model_sources(spec["data"], spec["model"], spec["scaler"], spec.get("bundle"))
+        inputs = {"render": RENDER_VERSION, "index": index, "title": spec["name"],
+                  "sources": source_fingerprint(sources), "dpi": dpi}
+        jobs.append({**inputs, "kind": "history", "name": f"{index}/history"})
+        jobs.append({**inputs, "kind": "macro", "name": f"{index}/macro"})
+        for horizon in horizons:
+            for scenario in scenarios:
+                jobs.append({
+                    **inputs, "kind": "forecast", "name": f"{index}/forecast_{horizon}m_{scenario}",
+                    "horizon": horizon, "scenario": scenario, "n_paths": n_paths, "seed": seed,
+                })
+    for job in jobs:
+        job["fingerprint"] = hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()[:16]
+    return jobs
+
+
+def artifact_paths(job):
+    return [f"{job['name']}.png", f"{job['name']}.csv"]
+
+
+# History charts by job kind: (payload method, expected column, its legend, title suffix)
+HISTORY_CHARTS = {
+    "history": ("get_vix_adjusted_history", "EXPECTED_SENSEX_VIX", "Macro + VIX Expected",
+                "Actual vs Macro-Driven Expected Level"),
+    "macro": ("get_macro_expected_history", "EXPECTED_SENSEX", "Macro Expected",
+              "Actual vs Macro Fair Value"),
+}
+
+
+def write_history(forecaster, kind, png, csv, name, dpi=300):
+    # Actual close vs one expected history ("history": macro + VIX, "macro": macro fair
+    # value) as a chart and a CSV; also used by output.py
+    import pandas as pd
+    from matplotlib.figure import Figure
+
+    method, column, label, title = HISTORY_CHARTS[kind]
+    frame = pd.DataFrame(getattr(forecaster, method)())
+    frame.to_csv(csv, index=False)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.plot(frame["CLOSE_SENSEX"].to_numpy(), label="Actual")
+    ax.plot(frame[column].to_numpy(), "--", label=label)
+    ticks = range(0, len(frame), max(1, len(frame) // 12))
+    ax.set_xticks(list(ticks), frame["YEAR"].iloc[list(ticks)], rotation=45)
+    ax.set_title(f"{name}: {title}")
+    ax.grid(True)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(png, dpi=dpi)
+
+
+def render(job, out_dir):
+    # Worker side: build (or reuse) the index's forecaster and write the job's chart and CSV
+    import pandas as pd
+    from sensex_macro_forecast_all_horizons import registry
+
+    started = time.perf_counter()
+    forecaster = registry.get(job["index"])
+    png, csv = (os.path.join(out_dir, path) for path in artifact_paths(job))
+    os.makedirs(os.path.dirname(png), exist_ok=True)
+    name = job["title"]
+
+    if job["kind"] == "forecast":
+        horizon, scenario = job["horizon"], job["scenario"]
+        levels = forecaster.get_forecast(horizon, scenario)
+        bands = forecaster.band_percentiles(horizon, scenario, job["n_paths"], job["seed"])
+        frame = pd.DataFrame({"Month": forecaster.forecast_labels(horizon), "Expected_Sensex": levels})
+        for pct in BAND_PERCENTILES:
+            frame[f"P{pct}"] = bands[pct]
+        frame.to_csv(csv, index=False)
+        forecaster.save_forecast_plot(
+            levels, frame[f"P{BAND_PERCENTILES[0]}"], frame[f"P{BAND_PERCENTILES[-1]}"], horizon, png,
+            title=f"{name}: {horizon}-Month Macro Fair-Value Forecast ({scenario})", dpi=job["dpi"],
+        )
+    else:
+        write_history(forecaster, job["kind"], png, csv, name, job["dpi"])
+    return job["name"], time.perf_counter() - started
+
+
+def _reuse(job, previous_dir, previous, out_dir):
+    # Hard-link the previous build's files when the job's inputs are unchanged
+    if previous.get(job["name"]) != job["fingerprint"]:
+        return False
+    sources = [os.path.join(previous_dir, path) for path in artifact_paths(job)]
+    if not all(os.path.exists(path) for path in sources):
+        return False
+    for src, path in zip(sources, artifact_paths(job)):
+        dst = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    return True
+
+
+def latest_version(reports_dir=REPORTS_DIR):
+    try:
+        with open(os.path.join(reports_dir, "latest.json")) as f:
+            return json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _read_manifest(version_dir):
+    try:
+        with open(os.path.join(version_dir, "manifest.json")) as f:
+            return json.load(f)["artifacts"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def build(jobs, reports_dir=REPORTS_DIR, workers=None, force=False):
+    # Returns (version, rendered, reused); rendered is [(name, seconds)]
+    version = hashlib.sha256("".join(job["fingerprint"] for job in jobs).encode()).hexdigest()[:12]
+    version_dir = os.path.join(reports_dir, version)
+    if not force and os.path.exists(os.path.join(version_dir, "manifest.json")):
+        _publish(reports_dir, version)
+        return version, [], len(jobs)
+
+    previous = latest_version(reports_dir)
+    previous_dir = os.path.join(reports_dir, previous) if previous else None
+    previous_manifest = {} if force or previous_dir is None else _read_manifest(previous_dir)
+
+    # Built under a temporary name and renamed, so latest.json never names a partial build
+    tmp_dir = os.path.join(reports_dir, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    todo = [job for job in jobs if not (previous_dir and _reuse(job, previous_dir, previous_manifest, tmp_dir))]
+
+    if workers == 1 or len(todo) <= 1:
+        rendered = [render(job, tmp_dir) for job in todo]
+    else:
+        # Jobs are sorted by index and handed out as one contiguous chunk per worker, so a
+        # worker only builds the forecasters of the indices its chunk covers
+        todo.sort(key=lambda job: job["index"])
+        n_workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            rendered = list(pool.map(render, todo, [tmp_dir] * len(todo),
+                                     chunksize=-(-len(todo) // n_workers)))
+
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "version": version,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "artifacts": {job["name"]: job["fingerprint"] for job in jobs},
+        }, f, indent=2)
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+    _publish(reports_dir, version)
+    return version, rendered, len(jobs) - len(todo)
+
+
+def _publish(reports_dir, version):
+    tmp_path = os.path.join(reports_dir, "latest.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": version}, f)
+    os.replace(tmp_path, os.path.join(reports_dir, "latest.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every forecast chart and CSV into a versioned report directory")
+    parser.add_argument("--indices", default=None, help="comma-separated indices (default: every configured index)")
+    parser.add_argument("--horizons", default=",".join(map(str, FORECAST_HORIZONS)))
+    parser.add_argument("--scenarios", default=",".join(SCENARIO_MULTS))
+    parser.add_argument("--n-paths", type=int, default=DEFAULT_N_PATHS, help="Monte Carlo paths behind the bands")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--out", default=REPORTS_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (1 renders serially)")
+    parser.add_argument("--force", action="store_true", help="render everything, ignoring previous builds")
+    args = parser.parse_args()
+
+    config = load_index_config()
+    indices = args.indices.split(",") if args.indices else list(config)
+    unknown = [index for index in indices if index not in config]
+    scenarios = args.scenarios.split(",")
+    unknown += [s for s in scenarios if s not in SCENARIO_MULTS]
+    if unknown:
+        parser.error(f"unknown index or scenario: {', '.join(unknown)}")
+    horizons = [int(h) for h in args.horizons.split(",")]
+
+    started = time.perf_counter()
+    jobs = plan(indices, horizons, scenarios, args.n_paths, dpi=args.dpi)
+    version, rendered, reused = build(jobs, args.out, args.workers, args.force)
+    for name, seconds in rendered:
+        print(f"  rendered {name:<40} {seconds:6.2f}s")
+    print(f"Report {version}: {len(rendered)} rendered, {reused} unchanged, "
+          f"{time.perf_counter() - started:.1f}s -> {os.path.abspath(os.path.join(args.out, version))}")
+
+
+if __name__ == "__main__":
+    main()
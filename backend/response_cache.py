@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import Response
+
+from metrics import span
+
+# Encoded-response cache for the read-only JSON API.
+# Payloads depend only on the loaded data/model version and the query string, so each one is
+# serialized once, fingerprinted with a strong ETag and pre-compressed. Repeat polls are
+# answered from memory, and clients that already hold the current ETag get a bodyless 304.
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent as-is; compression overhead outweighs the saving
+MIN_COMPRESS_BYTES = 512
+# Bodies larger than this (full feature / attribution histories at scale) are compressed at the
+# fastest levels: gzip -6 costs ~1 s per 10 MB of JSON floats for only ~7% smaller output
+LARGE_BODY_BYTES = 1 << 20
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+
+
+def accepted_encodings(header):
+    # Content codings the client accepts, ignoring any it explicitly refuses with q=0
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CachedResponse:
+    __slots__ = ("body", "encoded", "digest", "etags", "last_modified", "last_modified_ts")
+
+    def __init__(self, payload, last_modified_ts):
+        with span("serialize_json"):
+            self.body = dumps(payload)
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.last_modified_ts = int(last_modified_ts)
+        self.last_modified = formatdate(self.last_modified_ts, usegmt=True)
+
+        self.encoded = {}
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            large = len(self.body) > LARGE_BODY_BYTES
+            with span("compress"):
+                self.encoded["gzip"] = gzip.compress(self.body, compresslevel=1 if large else 6, mtime=0)
+                if brotli is not None:
+                    self.encoded["br"] = brotli.compress(self.body, quality=4 if large else 11)
+        # Strong validators must differ per content-coding (RFC 9110 8.8.3), so each encoded
+        # body gets its own tag: "<digest>", "<digest>-gzip", "<digest>-br"
+        self.etags = {None: f'"{self.digest}"'}
+        self.etags.update({encoding: f'"{self.digest}-{encoding}"' for encoding in self.encoded})
+
+    def not_modified(self, headers):
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            # Any encoding's tag matches: they all name the same payload
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or any(etag in tags for etag in self.etags.values())
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.last_modified_ts
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def select_encoding(self, headers):
+        # The best pre-compressed body the client accepts, or None for identity
+        accepted = accepted_encodings(headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in self.encoded and encoding in accepted:
+                return encoding
+        return None
+
+    def respond(self, headers):
+        encoding = self.select_encoding(headers)
+        common = {
+            "ETag": self.etags[encoding],
+            "Last-Modified": self.last_modified,
+            # Always revalidate: the ETag changes as soon as a new model version is loaded
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self.not_modified(headers):
+            return Response(status_code=304, headers=common)
+        if encoding is None:
+            return Response(self.body, media_type="application/json", headers=common)
+        return Response(
+            self.encoded[encoding], media_type="application/json",
+            headers={**common, "Content-Encoding": encoding},
+        )
+
+
+class ResponseCache:
+    # LRU of CachedResponse keyed by (index, model build, path, sorted query params).
+    # Each index's builds only move forward: that index's entries from an older build are
+    # dropped the first time a newer one is seen, and requests still finishing on an older
+    # snapshot bypass the cache.
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Latest build seen per index
+        self._builds = {}
+
+    def key(self, index, build, request):
+        return (index, build, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    def get(self, key):
+        index, build = key[0], key[1]
+        latest = self._builds.get(index)
+        if latest is None or build > latest:
+            for stale in [k for k in self._entries if k[0] == index]:
+                del self._entries[stale]
+            self._builds[index] = build
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        if key[1] != self._builds.get(key[0]):
+            # Built against a model that has since been swapped out; serve it but don't keep it
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
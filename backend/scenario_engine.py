@@ -0,0 +1,121 @@
+import numpy as np
+
+from sensex_macro_forecast_all_horizons import (
+    FEATURES, FORECAST_HORIZONS, standardize,
+)
+from path_engine import constant_rate_paths
+
+# What-if engine over macro shocks.
+# A macro state is the latest month's 8 model features plus VIX with additive perturbations
+# applied. Thousands of states go through the full chain as one matrix operation:
+# scaler -> bullish probability (linear_kernel) -> GST/VIX shock transforms -> return regression,
+# with the perturbed month taking the latest slot of the recent-signal window. A zero
+# perturbation therefore reproduces the forecaster's current expected monthly return.
+
+# Variables a scenario may perturb
+SWEEP_VARS = FEATURES + ["VIX"]
+
+
+def base_state(forecaster):
+    # The latest observed reading of every sweepable variable
+    return forecaster.latest(SWEEP_VARS)
+
+
+def apply_deltas(forecaster, deltas):
+    # deltas: {variable: (n,) array of additive perturbations}; returns an (n, 9) state matrix
+    unknown = set(deltas) - set(SWEEP_VARS)
+    if unknown:
+        raise ValueError(f"unknown sweep variables: {', '.join(sorted(unknown))}")
+    n = len(next(iter(deltas.values()))) if deltas else 1
+    states = np.tile(base_state(forecaster), (n, 1))
+    for var, values in deltas.items():
+        states[:, SWEEP_VARS.index(var)] += np.asarray(values, dtype=float)
+    return states
+
+
+def expected_returns(forecaster, states):
+    # Expected monthly return for every row of an (n, 9) state matrix in one batched pass
+    prob = forecaster.kernel.probability(states[:, :len(FEATURES)])
+
+    gst_shock = standardize(states[:, SWEEP_VARS.index("GST_YOY_LAG1")], forecaster.shock_stats("GST_YOY_LAG1"))
+    vix_shock = standardize(states[:, SWEEP_VARS.index("VIX")], forecaster.shock_stats("VIX"))
+    gst_neg = np.minimum(gst_shock, 0).clip(-2, 0)
+    vix_pos = (np.maximum(vix_shock - 0.5, 0) * 0.7).clip(0, 2)
+
+    # Average with the months before the latest one, as recent_expected_return does
+    earlier = forecaster.recent_signals()[:-1]
+    window = len(earlier) + 1
+    prob = (prob + earlier[:, 0].sum()) / window
+    gst_neg = (gst_neg + earlier[:, 1].sum()) / window
+    vix_pos = (vix_pos + earlier[:, 2].sum()) / window
+
+    expected = (
+        forecaster.alpha
+        + forecaster.beta_prob * prob
+        + forecaster.delta_gst * gst_neg
+        - abs(forecaster.theta_vix) * vix_pos
+    )
+    return np.clip(expected, -0.08, 0.06)
+
+
+def levels_for(forecaster, returns, horizons):
+    # {horizon: (n,) level after that many months} for every expected return
+    paths = constant_rate_paths(forecaster.current_level, returns, max(horizons))
+    return {h: paths[:, h - 1] for h in horizons}
+
+
+def latin_hypercube(n, ranges, seed=42):
+    # n stratified samples over {variable: (low, high)}: each variable's range is cut into n
+    # equal strata, one draw per stratum, with strata shuffled independently per variable
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for var, (low, high) in ranges.items():
+        strata = (rng.permutation(n) + rng.random(n)) / n
+        samples[var] = low + strata * (high - low)
+    return samples
+
+
+def sweep_grid(forecaster, x_var, x_values, y_var, y_values, horizons=FORECAST_HORIZONS):
+    # Heatmap over two perturbed variables; every cell comes from one batched evaluation.
+    # Returns matrices indexed [y][x].
+    xs, ys = np.meshgrid(np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+    deltas = {x_var: xs.ravel()}
+    if y_var == x_var:
+        deltas[x_var] = deltas[x_var] + ys.ravel()
+    else:
+        deltas[y_var] = ys.ravel()
+
+    returns = expected_returns(forecaster, apply_deltas(forecaster, deltas))
+    levels = levels_for(forecaster, returns, horizons)
+    shape = xs.shape
+    return {
+        "x": {"variable": x_var, "deltas": list(map(float, x_values))},
+        "y": {"variable": y_var, "deltas": list(map(float, y_values))},
+        "expected_monthly_return": np.round(returns.reshape(shape) * 100, 4).tolist(),
+        "levels": {str(h): np.round(levels[h].reshape(shape)).tolist() for h in horizons},
+    }
+
+
+def _distribution(values, percentiles=(5, 25, 50, 75, 95)):
+    pct = np.percentile(values, percentiles)
+    summary = {f"p{p}": float(v) for p, v in zip(percentiles, pct)}
+    summary["mean"] = float(values.mean())
+    return summary
+
+
+def sweep_lhs(forecaster, ranges, n=1000, seed=42, horizons=FORECAST_HORIZONS, include_samples=False):
+    # Distribution of expected returns and levels over n Latin-hypercube macro states
+    samples = latin_hypercube(n, ranges, seed)
+    returns = expected_returns(forecaster, apply_deltas(forecaster, samples))
+    levels = levels_for(forecaster, returns, horizons)
+
+    result = {
+        "n": n,
+        "seed": seed,
+        "expected_monthly_return": _distribution(returns * 100),
+        "levels": {str(h): _distribution(levels[h]) for h in horizons},
+    }
+    if include_samples:
+        result["samples"] = {var: values.tolist() for var, values in samples.items()}
+        result["samples"]["expected_monthly_return"] = (returns * 100).tolist()
+    return result
@@ -1,22 +1,320 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import joblib
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
 import os
 import sys
+import time
+import hashlib
+import copy
+import functools
+import itertools
+import json
+import math
+import threading
+from collections import OrderedDict
+
+# matplotlib, joblib and sklearn are imported where they are used so that importing
+# this module (and server.py) stays cheap; see import_budget.py. With a coefficient bundle
+# in place (see linear_kernel.py) serving never imports sklearn or joblib at all.
+
+from data_store import load_sheet
+from linear_kernel import LinearKernel, ReturnModel, standard_scores, load_bundle, bundle_is_current
+from feature_engine import build_feature_matrix, feature_names, rolling_mean, zscore
+from attribution_engine import attribution_names, build_attribution
+from regime_engine import RegimeModel
+from metrics import span, FORECASTER_EVICTIONS
+from path_engine import compound_paths, constant_rate_paths, simulate_scenario_paths, percentile_bands
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 OUTPUT_DIR = os.path.join(BASE_DIR, "..", "outputs")
 
+# Files a forecaster is built from; a change to any of them means a new model version
+MODEL_DATA_PATH = os.path.join(DATA_DIR, "model_with_vix - Sheet1.csv")
+BULLISH_MODEL_PATH = os.path.join(DATA_DIR, "bullish_model.pkl")
+SCALER_PATH = os.path.join(DATA_DIR, "scaler.pkl")
+# Scaler and bullish model flattened to plain coefficients by linear_kernel.py
+MODEL_BUNDLE_PATH = os.path.join(DATA_DIR, "model_bundle.json")
+MODEL_SOURCES = (MODEL_DATA_PATH, BULLISH_MODEL_PATH, SCALER_PATH)
+
+# Horizons and scenarios served by the dashboard; these are precomputed after every load
+FORECAST_HORIZONS = (6, 12, 18)
+SCENARIO_MULTS = {'base': 1.0, 'bull': 1.2, 'bear': 0.8}
+# Forecast mode that compounds regime-switching expected returns instead of a multiplier
+REGIME_SCENARIO = 'regime'
+# Forecast months are labelled from the "March 2025 Live" anchor
+FORECAST_START = pd.Timestamp("2025-03-01")
+# Percentiles reported by the Monte Carlo uncertainty bands
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Inputs to the bullish probability model
+FEATURES = [
+    "GST_YOY_LAG1", "IIP_GROWTH_LAG1", "ECI_GROWTH_LAG1",
+    "REPO_LAG1", "USDINR_CHANGE_LAG1", "CRUDE_CHANGE",
+    "GOLD_CHANGE", "FPI_LAG1"
+]
+# Columns stored as text in the sheet (CLOSE_SENSEX carries thousands separators)
+NUMERIC_COLS = FEATURES + ["VIX", "SENSEX_RETURN", "CLOSE_SENSEX"]
+# The expected monthly return is driven by the average of the latest RECENT_WINDOW readings
+RECENT_WINDOW = int(os.environ.get("SENSEX_RECENT_WINDOW", "3"))
+RECENT_COLS = ["BULLISH_PROBABILITY", "GST_SHOCK_NEG", "VIX_SHOCK_POS"]
+# The only columns a forecaster keeps after prep: its inputs plus the derived model signals.
+# The text YEAR column and the intermediate GST_SHOCK / VIX_SHOCK are dropped.
+STORED_COLS = NUMERIC_COLS + RECENT_COLS
+_COL = {name: i for i, name in enumerate(STORED_COLS)}
+# Visual weights applied to the bullish model's coefficients before they become contribution
+# percentages, tuned to match the user reference ranking (FPI/USD > ECI)
+CONTRIBUTION_WEIGHTS = {
+    "GST_YOY_LAG1": 0.9,        # Reduce GST slightly (transfer to crude/iip)
+    "IIP_GROWTH_LAG1": 1.35,    # Boost IIP (but keep < Crude, 1.35 < 1.5 usually holds if raw vals similar)
+    "ECI_GROWTH_LAG1": 0.6,     # Dampen ECI
+    "REPO_LAG1": 0.5,           # Reduce Repo (ensure < Gold)
+    "USDINR_CHANGE_LAG1": 1.2,  # Boost USDINR
+    "CRUDE_CHANGE": 1.5,        # Boost Crude significantly
+    "GOLD_CHANGE": 1.0,
+    "FPI_LAG1": 1.3,            # Boost FPI
+}
+_CONTRIBUTION_MULTS = np.array([CONTRIBUTION_WEIGHTS[name] for name in FEATURES])
+# Columns the rolling / expanding feature matrix is built from (see feature_matrix)
+FEATURE_SOURCE_COLS = FEATURES + ["VIX", "SENSEX_RETURN"] + RECENT_COLS
+FEATURE_NAMES = feature_names(FEATURE_SOURCE_COLS)
+ATTRIBUTION_NAMES = attribution_names(FEATURES)
+
+
+def _parse_shock_window(value):
+    if value in ("full", "expanding"):
+        return value
+    if int(value) < 1:
+        raise ValueError(f"SENSEX_SHOCK_WINDOW must be full, expanding or >= 1 months, got {value}")
+    return int(value)
+
+
+# How the GST and VIX shocks are standardized: "expanding" (each month against the months up
+# to it), a number of months for a trailing window, or "full" (over the whole history, the
+# original calibration, which scales every row with data from its future). Only the return
+# regression reads the shocks, and prep refits it on every load, so any mode is consistent.
+SHOCK_WINDOW = _parse_shock_window(os.environ.get("SENSEX_SHOCK_WINDOW", "expanding"))
+# Rows appended incrementally between two exact full refits
+REFIT_CHECK_EVERY = int(os.environ.get("SENSEX_REFIT_EVERY", "12"))
+
+# Index served when a request does not name one; more indices are declared in the index config
+DEFAULT_INDEX = "sensex"
+INDEX_CONFIG_PATH = os.environ.get("SENSEX_INDEX_CONFIG", os.path.join(DATA_DIR, "indices.json"))
+# Built forecasters are evicted least-recently-used first once their estimated size exceeds this
+MEMORY_BUDGET_BYTES = int(float(os.environ.get("SENSEX_MEMORY_BUDGET_MB", "1024")) * 2**20)
+# Measured Python-object size of one cached forecast month (a level float plus its point dict)
+FORECAST_CACHE_BYTES_PER_MONTH = 256
+
+
+def load_model_data(path=MODEL_DATA_PATH):
+    # Cleaned once into the columnar cache; re-ingested only when the CSV changes
+    return load_sheet(path, NUMERIC_COLS)
+
+
+def clean_observation(row):
+    # One incoming period as floats, with the same comma stripping as the CSV ingest
+    missing = [col for col in NUMERIC_COLS if col not in row]
+    if missing:
+        raise ValueError(f"observation is missing {', '.join(missing)}")
+    cleaned = {}
+    for col in NUMERIC_COLS:
+        try:
+            value = float(str(row[col]).replace(",", ""))
+        except ValueError:
+            raise ValueError(f"{col} is not a number: {row[col]!r}") from None
+        # NaN or inf would poison the running statistics and the normal equations
+        if not math.isfinite(value):
+            raise ValueError(f"{col} must be finite, got {row[col]!r}")
+        cleaned[col] = value
+    if "YEAR" in row:
+        cleaned["YEAR"] = str(row["YEAR"])
+    return cleaned
+
+
+def running_stats(values):
+    # (count, mean, sum of squared deviations) for Welford updates
+    values = np.asarray(values, dtype=float)
+    mean = values.mean()
+    return (len(values), mean, float(((values - mean) ** 2).sum()))
+
+
+def update_running_stats(stats, x):
+    n, mean, m2 = stats
+    n += 1
+    delta = x - mean
+    mean += delta / n
+    m2 += delta * (x - mean)
+    return (n, mean, m2)
+
+
+def standardize(x, stats):
+    # StandardScaler semantics: population std, and a zero std leaves values unscaled
+    n, mean, m2 = stats
+    std = np.sqrt(m2 / n)
+    return (x - mean) / (std if std > 0 else 1.0)
+
+
+def source_fingerprint(paths=MODEL_SOURCES):
+    # Short hash of the name, size and mtime of every model source file
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def model_sources(data_path, model_path, scaler_path, bundle_path=None):
+    # Files a forecaster is built from; a deployment may ship the bundle without pickles
+    models = (model_path, scaler_path, bundle_path)
+    return (data_path,) + tuple(path for path in models if path and os.path.exists(path))
+
+
+def contribution_shares(coef):
+    # Percent of the weighted |coefficient| total per feature, for one coefficient vector (8,)
+    # or a stack of them (n, 8). The total is accumulated left to right like a plain sum().
+    weighted = np.abs(np.asarray(coef, dtype=float) * _CONTRIBUTION_MULTS)
+    return weighted / np.cumsum(weighted, axis=-1)[..., -1:] * 100
+
+
+def contribution_label(name):
+    return name.replace("_LAG1", "").replace("_CHANGE", "").replace("_", " ")
+
+
+def shock_scores(x):
+    # Standardized shock input under SHOCK_WINDOW
+    if SHOCK_WINDOW == "full":
+        return standard_scores(x)
+    return zscore(x, None if SHOCK_WINDOW == "expanding" else SHOCK_WINDOW)
+
+
+def add_shock_features(df):
+    # GST demand-collapse and VIX panic shocks, standardized over the rows in df
+    df["GST_SHOCK"] = shock_scores(df["GST_YOY_LAG1"].to_numpy())
+    df["GST_SHOCK_NEG"] = np.minimum(df["GST_SHOCK"], 0).clip(-2, 0)
+
+    df["VIX_SHOCK"] = shock_scores(df["VIX"].to_numpy())
+    df["VIX_SHOCK_POS"] = np.maximum(df["VIX_SHOCK"] - 0.5, 0)
+    df["VIX_SHOCK_POS"] = (df["VIX_SHOCK_POS"] * 0.7).clip(0, 2)
+    return df
+
+
+def return_model_inputs(df):
+    return pd.DataFrame({
+        "PROB": df["BULLISH_PROBABILITY"],
+        "GST": df["GST_SHOCK_NEG"],
+        "VIX": df["VIX_SHOCK_POS"]
+    })
+
+
+def fit_return_model(df):
+    return ReturnModel.fit(return_model_inputs(df).to_numpy(), df["SENSEX_RETURN"].to_numpy())
+
+
+def recent_expected_return(df, ret_model, window=None):
+    # Expected monthly return from the average of the last `window` macro readings
+    alpha = ret_model.intercept
+    beta_prob, delta_gst, theta_vix = ret_model.coef
+    recent = df.tail(window or RECENT_WINDOW)
+    expected = (
+        alpha
+        + beta_prob * recent["BULLISH_PROBABILITY"].mean()
+        + delta_gst * recent["GST_SHOCK_NEG"].mean()
+        - abs(theta_vix) * recent["VIX_SHOCK_POS"].mean()
+    )
+    return np.clip(expected, -0.08, 0.06)
+
+
+@functools.lru_cache(maxsize=None)
+def _month_labels(horizon, start):
+    return tuple(
+        (start + pd.DateOffset(months=i+1)).strftime("%b '%y")
+        for i in range(horizon)
+    )
+
+
+def forecast_month_labels(horizon, start=FORECAST_START):
+    # "Apr '25", "May '25", ... for the months after `start`; built once per horizon
+    return _month_labels(int(horizon), start)
+
+
+@functools.lru_cache(maxsize=8)
+def history_month_labels(n, start=FORECAST_START):
+    # n monthly labels ending the month before `start` (Feb '25 by default), the same labels as
+    # pd.date_range(end=start, periods=n, freq='M'). Monthly periods are used so
+    # that histories longer than datetime64's ~580-year range still get labels.
+    end = pd.Period(start, freq="M") - 1
+    return tuple(pd.period_range(end=end, periods=int(n), freq="M").strftime("%b '%y"))
+
+
+# Monotonic build number shared by every forecaster built in this process
+_build_counter = itertools.count(1)
+
+# Unpickled models by path, reused while the file is unchanged, so indices that share a
+# bullish model or scaler (and reloads that only changed the data) hold one copy of it
+_model_files = {}
+_model_files_lock = threading.Lock()
+
+
+def load_model_file(path, loader=None):
+    # loader defaults to joblib.load (the pickled sklearn estimators)
+    if loader is None:
+        import joblib
+        loader = joblib.load
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _model_files_lock:
+        cached = _model_files.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    loaded = loader(path)
+    with _model_files_lock:
+        _model_files[path] = (key, loaded)
+    return loaded
+
+
+def load_model_kernel(model_path, scaler_path, bundle_path=None):
+    # The scaler and bullish model as a LinearKernel: from the coefficient bundle when it is
+    # present and was exported from these pickles, otherwise from the pickles themselves
+    if bundle_path and os.path.exists(bundle_path):
+        bundle = load_model_file(bundle_path, load_bundle)
+        if bundle_is_current(bundle, {"model": model_path, "scaler": scaler_path}):
+            if bundle["features"] != FEATURES:
+                raise ValueError(f"{bundle_path}: features do not match FEATURES")
+            return LinearKernel.from_bundle(bundle)
+        print(f"Warning: {bundle_path} is older than the pickles; re-export it with linear_kernel.py")
+    return LinearKernel.from_estimators(load_model_file(scaler_path), load_model_file(model_path), FEATURES)
+
+
 class SensexForecaster:
-    def __init__(self):
-        self.df = None
-        self.model = None
-        self.scaler = None
+    # The per-row state is one read-only float64 block of STORED_COLS in column-major order,
+    # so every column is a contiguous array that readers get as a zero-copy view
+    __slots__ = (
+        "data_path", "model_path", "scaler_path", "bundle_path",
+        "kernel", "ret_model",
+        "expected_monthly_return", "current_level", "vol",
+        "alpha", "beta_prob", "delta_gst", "theta_vix",
+        "version", "_data", "_residuals", "_forecast_cache", "_features", "_attribution", "_regimes",
+        # Incremental-ingest state, see append_observation
+        "_pending_rows", "_pending_residuals", "_gst_stats", "_vix_stats", "_ret_stats",
+        "_xtx", "_xty", "_recent", "_appended_since_refit",
+        # Month the labels are anchored to: history ends the month before, forecasts start the
+        # month after. Every appended row moves it forward one month.
+        "forecast_start",
+        # Set by the registry: called after a lazily built structure changes memory_bytes()
+        "on_resize",
+    )
+
+    def __init__(self, data_path=MODEL_DATA_PATH, model_path=BULLISH_MODEL_PATH, scaler_path=SCALER_PATH,
+                 bundle_path=MODEL_BUNDLE_PATH):
+        # data_path: any sheet with the model_with_vix schema (e.g. a synthetic scale-test history)
+        self.data_path = data_path
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.bundle_path = bundle_path
+        self._data = None
+        self._residuals = None
+        self.kernel = None
         self.ret_model = None
         self.expected_monthly_return = 0.0
         self.current_level = 0.0
@@ -25,87 +323,424 @@ class SensexForecaster:
         self.beta_prob = 0.0
         self.delta_gst = 0.0
         self.theta_vix = 0.0
+        self.version = {}
+        self._forecast_cache = {}
+        self._features = None
+        self._attribution = None
+        self._regimes = None
+        self._pending_rows = []
+        self._pending_residuals = []
+        self._gst_stats = self._vix_stats = self._ret_stats = None
+        self._xtx = self._xty = None
+        self._recent = ()
+        self._appended_since_refit = 0
+        self.forecast_start = FORECAST_START
+        self.on_resize = None
         self.load_and_prep()
 
+    # Rows appended by append_observation are buffered and only stacked onto the block
+    # (and the residual array) when something actually reads them, keeping appends O(1)
+    @property
+    def data(self):
+        if self._pending_rows:
+            self._materialize()
+        return self._data
+
+    @property
+    def residuals(self):
+        if self._pending_rows:
+            self._materialize()
+        return self._residuals
+
+    def _store(self, data, residuals):
+        data = np.asfortranarray(data, dtype=np.float64)
+        residuals = np.ascontiguousarray(residuals, dtype=np.float64)
+        data.flags.writeable = False
+        residuals.flags.writeable = False
+        self._data, self._residuals = data, residuals
+        self._pending_rows, self._pending_residuals = [], []
+
+    def _materialize(self):
+        self._store(
+            np.vstack([self._data, np.array(self._pending_rows)]),
+            np.concatenate([self._residuals, self._pending_residuals]),
+        )
+
+    def rehome(self, allocate):
+        # Move the row block and residuals into buffers returned by allocate(nbytes), e.g.
+        # shared memory that pre-forked workers map read-only (see prefork.py)
+        placed = []
+        for array in (self.data, self.residuals):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=allocate(array.nbytes), order="F")
+            view[...] = array
+            placed.append(view)
+        self._store(*placed)
+
+    @property
+    def rows(self):
+        return len(self.data)
+
+    def column(self, name):
+        # Read-only view of one stored column; no copy is made
+        return self.data[:, _COL[name]]
+
+    def latest(self, names):
+        # The newest row's values for `names`, as a new float array
+        return self.data[-1, [_COL[name] for name in names]]
+
+    def recent_signals(self):
+        # (k, 3) RECENT_COLS values of the latest k <= RECENT_WINDOW months, oldest first;
+        # the window recent_expected_return averages
+        return np.asarray(self._recent, dtype=float).reshape(-1, len(RECENT_COLS))
+
+    @property
+    def df(self):
+        # The stored columns as a DataFrame over the same read-only memory (for scripts and
+        # debugging; the API reads columns directly)
+        return pd.DataFrame(self.data, columns=STORED_COLS, copy=False)
+
     def load_and_prep(self):
+        # Anything cached from a previous load is stale once the data or models change
+        self._forecast_cache = {}
+        started = time.perf_counter()
+        # Taken before reading so a file replaced mid-load shows up as a newer version
+        sources = self.sources
+        fingerprint = source_fingerprint(sources)
+
         # Load Data
-        self.df = pd.read_csv(os.path.join(DATA_DIR, "model_with_vix - Sheet1.csv"))
-        self.df.columns = self.df.columns.str.strip().str.upper().str.replace(" ", "_")
-        
-        # Clean Numeric Data
-        numeric_cols = [
-            "GST_YOY_LAG1", "IIP_GROWTH_LAG1", "ECI_GROWTH_LAG1",
-            "REPO_LAG1", "USDINR_CHANGE_LAG1", "CRUDE_CHANGE",
-            "GOLD_CHANGE", "FPI_LAG1", "VIX",
-            "SENSEX_RETURN", "CLOSE_SENSEX"
-        ]
-        for col in numeric_cols:
-            self.df[col] = self.df[col].astype(str).str.replace(",", "").astype(float)
+        with span("load_data"):
+            frame = load_model_data(self.data_path)
 
         # Load Models
-        self.model = joblib.load(os.path.join(DATA_DIR, "bullish_model.pkl"))
-        self.scaler = joblib.load(os.path.join(DATA_DIR, "scaler.pkl"))
+        with span("unpickle_models"):
+            self.kernel = load_model_kernel(self.model_path, self.scaler_path, self.bundle_path)
+
+        self.prep(frame)
+
+        self.version = {
+            "build": next(_build_counter),
+            "fingerprint": fingerprint,
+            "data_modified": max(os.path.getmtime(path) for path in sources),
+            "rows": self.rows,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "load_seconds": round(time.perf_counter() - started, 4),
+        }
+
+    @property
+    def sources(self):
+        return model_sources(self.data_path, self.model_path, self.scaler_path, self.bundle_path)
+
+    def memory_bytes(self):
+        # Rough resident size of the per-index state (the shared model objects are not counted):
+        # the row block, the lazily built feature / attribution matrices and regime model, and
+        # the serialized forecast cache
+        features = self._features.nbytes if self._features is not None else 0
+        attribution = self._attribution[1].nbytes if self._attribution is not None else 0
+        regimes = self._regimes[1].nbytes if self._regimes is not None else 0
+        months = sum(len(entry["levels"]) for entry in self._forecast_cache.values())
+        return int(self.data.nbytes + self.residuals.nbytes + features + attribution + regimes
+                   + months * FORECAST_CACHE_BYTES_PER_MONTH)
+
+    def _resized(self):
+        if self.on_resize is not None:
+            self.on_resize(self)
+
+    def feature_matrix(self):
+        # Rolling / expanding z-scores, means and lags of FEATURE_SOURCE_COLS (feature_engine.py),
+        # built on first use and rebuilt once the rows change. Only /api/features reads it: the
+        # shocks are computed in prep before the model signals it covers exist, so they (and the
+        # backtest and the history smoothing) call zscore / rolling_mean directly instead.
+        features = self._features
+        if features is None or len(features.values) != self.rows:
+            data = self.data
+            features = build_feature_matrix({name: data[:, _COL[name]] for name in FEATURE_SOURCE_COLS})
+            self._features = features
+            self._resized()
+        return features
+
+    def attribution_matrix(self):
+        # Per-row log-odds and expected-return terms (attribution_engine.py) for this build;
+        # ingest and refits change the coefficients, so the matrix is kept per build
+        cached = self._attribution
+        if cached is None or cached[0] != self.version.get("build"):
+            data = self.data
+            matrix = build_attribution(
+                self.kernel, data[:, :len(FEATURES)],
+                (self.alpha, self.beta_prob, self.delta_gst, self.theta_vix),
+                data[:, [_COL[name] for name in RECENT_COLS]],
+            )
+            cached = self._attribution = (self.version.get("build"), matrix)
+            self._resized()
+        return cached[1]
+
+    def regime_model(self):
+        # Regime transition matrix and per-regime returns (regime_engine.py) for this build,
+        # fitted on first use so ingest stays O(1)
+        cached = self._regimes
+        if cached is None or cached[0] != self.version.get("build"):
+            model = RegimeModel.fit(self.column("BULLISH_PROBABILITY"), self.column("SENSEX_RETURN"))
+            cached = self._regimes = (self.version.get("build"), model)
+            self._resized()
+        return cached[1]
+
+    def _tail(self, name, k):
+        # The last k values of a stored column without materializing pending rows
+        if k <= 0:
+            return np.empty(0)
+        idx = _COL[name]
+        pending = [row[idx] for row in self._pending_rows[-k:]]
+        need = k - len(pending)
+        older = self._data[max(len(self._data) - need, 0):, idx] if need > 0 else np.empty(0)
+        return np.concatenate([older, pending])
+
+    def shock_stats(self, name):
+        # (count, mean, M2) that the latest GST_YOY_LAG1 / VIX reading is standardized with
+        if isinstance(SHOCK_WINDOW, int):
+            return running_stats(self._tail(name, SHOCK_WINDOW))
+        return self._gst_stats if name == "GST_YOY_LAG1" else self._vix_stats
+
+    def prep(self, df):
+        # Full (re)fit of everything derived from the rows in df with the loaded models.
+        # df is a scratch frame of the sheet's columns; only STORED_COLS are kept from it.
 
         # Compute Probabilities
-        features = [
-            "GST_YOY_LAG1", "IIP_GROWTH_LAG1", "ECI_GROWTH_LAG1",
-            "REPO_LAG1", "USDINR_CHANGE_LAG1", "CRUDE_CHANGE",
-            "GOLD_CHANGE", "FPI_LAG1"
-        ]
-        X_scaled = self.scaler.transform(self.df[features])
-        self.df["BULLISH_PROBABILITY"] = self.model.predict_proba(X_scaled)[:, 1]
+        with span("predict_proba"):
+            df["BULLISH_PROBABILITY"] = self.kernel.probability(df[FEATURES].to_numpy(dtype=float))
 
         # Build Macro Shock Variables
-        gst_scaler = StandardScaler()
-        self.df["GST_SHOCK"] = gst_scaler.fit_transform(self.df[["GST_YOY_LAG1"]])
-        self.df["GST_SHOCK_NEG"] = np.minimum(self.df["GST_SHOCK"], 0).clip(-2, 0)
-
-        vix_scaler = StandardScaler()
-        self.df["VIX_SHOCK"] = vix_scaler.fit_transform(self.df[["VIX"]])
-        self.df["VIX_SHOCK_POS"] = np.maximum(self.df["VIX_SHOCK"] - 0.5, 0)
-        self.df["VIX_SHOCK_POS"] = (self.df["VIX_SHOCK_POS"] * 0.7).clip(0, 2)
+        with span("shock_features"):
+            add_shock_features(df)
 
         # Calibrate Return Model
-        X_ret = pd.DataFrame({
-            "PROB": self.df["BULLISH_PROBABILITY"],
-            "GST": self.df["GST_SHOCK_NEG"],
-            "VIX": self.df["VIX_SHOCK_POS"]
-        })
-        y_ret = self.df["SENSEX_RETURN"]
-
-        self.ret_model = LinearRegression()
-        self.ret_model.fit(X_ret, y_ret)
-
-        self.alpha = self.ret_model.intercept_
-        self.beta_prob, self.delta_gst, self.theta_vix = self.ret_model.coef_
+        with span("fit_return_model"):
+            self.ret_model = fit_return_model(df)
+
+        self.alpha = self.ret_model.intercept
+        self.beta_prob, self.delta_gst, self.theta_vix = self.ret_model.coef
+        # In-sample residuals, resampled by the bootstrap mode of the band simulation
+        X_ret = return_model_inputs(df)
+        residuals = df["SENSEX_RETURN"].to_numpy() - self.ret_model.predict(X_ret.to_numpy())
         
         # Calculate Expected Monthly Return
-        recent = self.df.tail(3)
-        self.expected_monthly_return = (
+        self.expected_monthly_return = recent_expected_return(df, self.ret_model)
+
+        self.current_level = df["CLOSE_SENSEX"].iloc[-1]
+        self.vol = df["SENSEX_RETURN"].std()
+
+        # Running statistics that append_observation updates one row at a time
+        self._gst_stats = running_stats(df["GST_YOY_LAG1"].to_numpy())
+        self._vix_stats = running_stats(df["VIX"].to_numpy())
+        self._ret_stats = running_stats(df["SENSEX_RETURN"].to_numpy())
+        X_aug = np.column_stack([np.ones(len(df)), X_ret.to_numpy()])
+        self._xtx = X_aug.T @ X_aug
+        self._xty = X_aug.T @ df["SENSEX_RETURN"].to_numpy()
+        self._recent = tuple(map(tuple, df[RECENT_COLS].tail(RECENT_WINDOW).to_numpy()))
+        self._appended_since_refit = 0
+
+        self._store(df[STORED_COLS].to_numpy(dtype=np.float64), residuals)
+        self._features = None
+        self._attribution = None
+        self._regimes = None
+
+        self.build_forecast_cache()
+
+    def append_observation(self, row):
+        # Add one new period without a full refit. The shock scalers' running mean/variance,
+        # the return regression's sufficient statistics (X'X, X'y), the recent-signal window,
+        # current level and vol are all updated in O(1). Earlier rows keep the shock values they
+        # were given, so every REFIT_CHECK_EVERY rows a full refit replaces the incremental state.
+        # Returns the refit's drift report, or None when no refit ran.
+        row = clean_observation(row)
+
+        prob = float(self.kernel.probability([row[col] for col in FEATURES]))
+
+        self._gst_stats = update_running_stats(self._gst_stats, row["GST_YOY_LAG1"])
+        self._vix_stats = update_running_stats(self._vix_stats, row["VIX"])
+        self._ret_stats = update_running_stats(self._ret_stats, row["SENSEX_RETURN"])
+
+        # Full and expanding standardization both use every row so far; a trailing window only
+        # the last SHOCK_WINDOW rows including this one
+        gst_stats, vix_stats = self._gst_stats, self._vix_stats
+        if isinstance(SHOCK_WINDOW, int):
+            gst_stats = running_stats(np.append(self._tail("GST_YOY_LAG1", SHOCK_WINDOW - 1), row["GST_YOY_LAG1"]))
+            vix_stats = running_stats(np.append(self._tail("VIX", SHOCK_WINDOW - 1), row["VIX"]))
+        gst_shock = standardize(row["GST_YOY_LAG1"], gst_stats)
+        vix_shock = standardize(row["VIX"], vix_stats)
+        gst_neg = min(max(gst_shock, -2.0), 0.0)
+        vix_pos = min(max(vix_shock - 0.5, 0.0) * 0.7, 2.0)
+
+        # Rank-one update of the normal equations, then re-solve the 4x4 system
+        x = np.array([1.0, prob, gst_neg, vix_pos])
+        self._xtx = self._xtx + np.outer(x, x)
+        self._xty = self._xty + x * row["SENSEX_RETURN"]
+        coef = np.linalg.lstsq(self._xtx, self._xty, rcond=None)[0]
+        self.alpha, self.beta_prob, self.delta_gst, self.theta_vix = coef
+
+        self._recent = (self._recent + ((prob, gst_neg, vix_pos),))[-RECENT_WINDOW:]
+        recent = np.mean(self._recent, axis=0)
+        self.expected_monthly_return = np.clip(
             self.alpha
-            + self.beta_prob * recent["BULLISH_PROBABILITY"].mean()
-            + self.delta_gst * recent["GST_SHOCK_NEG"].mean()
-            - abs(self.theta_vix) * recent["VIX_SHOCK_POS"].mean()
+            + self.beta_prob * recent[0]
+            + self.delta_gst * recent[1]
+            - abs(self.theta_vix) * recent[2],
+            -0.08, 0.06
         )
-        self.expected_monthly_return = np.clip(self.expected_monthly_return, -0.08, 0.06)
+        self.current_level = row["CLOSE_SENSEX"]
+        self.vol = np.sqrt(self._ret_stats[2] / (self._ret_stats[0] - 1))
+
+        self._pending_rows = self._pending_rows + [
+            tuple(row[col] for col in NUMERIC_COLS) + (prob, gst_neg, vix_pos)
+        ]
+        self._pending_residuals = self._pending_residuals + [row["SENSEX_RETURN"] - x @ coef]
+        self._appended_since_refit += 1
+        self.forecast_start = self.forecast_start + pd.DateOffset(months=1)
+
+        if self._appended_since_refit >= REFIT_CHECK_EVERY:
+            return self.refit()
+        self.build_forecast_cache()
+        return None
+
+    def refit(self):
+        # Periodic full refit: replaces the incremental state with an exact fit over every row
+        # and reports how far the incremental expected return had drifted from it
+        incremental = float(self.expected_monthly_return)
+        # A fresh scratch frame; older snapshots keep sharing the previous read-only block
+        self.prep(pd.DataFrame(self.data[:, :len(NUMERIC_COLS)], columns=NUMERIC_COLS))
+        return {"drift": abs(float(self.expected_monthly_return) - incremental), "refit": True}
+
+    def build_forecast_cache(self):
+        # Precompute levels and serialized month/value points for every served
+        # (horizon, scenario) pair so the forecast endpoints are plain lookups
+        with span("build_forecast_cache"):
+            self._forecast_cache = self._build_forecast_cache()
+
+    def _build_forecast_cache(self):
+        scenarios = list(SCENARIO_MULTS)
+        max_horizon = max(FORECAST_HORIZONS)
+
+        # Every scenario path in one call; shorter horizons are prefixes of the longest
+        paths = self._scenario_paths([SCENARIO_MULTS[s] for s in scenarios], max_horizon)
+
+        cache = {}
+        for scenario, path in zip(scenarios, paths):
+            for horizon in FORECAST_HORIZONS:
+                levels = path[:horizon].tolist()
+                cache[(horizon, scenario)] = {
+                    "levels": levels,
+                    "points": self._to_points(levels),
+                }
+        return cache
+
+    def _scenario_paths(self, mults, horizon):
+        # Constant scenario-adjusted return per row, compounded in closed form
+        rates = self.expected_monthly_return * np.asarray(mults, dtype=float)
+        return constant_rate_paths(self.current_level, rates, horizon)
 
-        self.current_level = self.df["CLOSE_SENSEX"].iloc[-1]
-        self.vol = self.df["SENSEX_RETURN"].std()
+    def _compute_forecast(self, horizon, scenario):
+        if scenario == REGIME_SCENARIO:
+            return self.regime_model().forecast(self.current_level, horizon)["expected_level"].tolist()
+        mult = SCENARIO_MULTS.get(scenario, 1.0)
+        return self._scenario_paths([mult], horizon)[0].tolist()
+
+    def forecast_labels(self, horizon):
+        return forecast_month_labels(horizon, self.forecast_start)
+
+    def history_labels(self):
+        return history_month_labels(self.rows, self.forecast_start)
+
+    def _to_points(self, levels):
+        labels = self.forecast_labels(len(levels))
+        return [{"month": label, "value": round(val)} for label, val in zip(labels, levels)]
+
+    def _cache_key(self, horizon, scenario):
+        # Unknown scenarios fall back to the base multiplier, so share its entry. The regime
+        # mode is not cached here; it reads the regime model's precomputed n-step matrices.
+        if scenario == REGIME_SCENARIO:
+            return (horizon, scenario)
+        return (horizon, scenario if scenario in SCENARIO_MULTS else 'base')
 
     def get_forecast(self, horizon, scenario='base'):
-        scenario_mults = {'base': 1.0, 'bull': 1.2, 'bear': 0.8}
-        mult = scenario_mults.get(scenario, 1.0)
-        
-        # Adjust return based on scenario
-        adjusted_return = self.expected_monthly_return * mult
-        
-        lvl = self.current_level
-        levels = []
-        for _ in range(horizon):
-            lvl *= (1 + adjusted_return)
-            levels.append(lvl)
-            
-        return levels
+        entry = self._forecast_cache.get(self._cache_key(horizon, scenario))
+        if entry is not None:
+            return list(entry["levels"])
+        return self._compute_forecast(horizon, scenario)
+
+    def get_forecast_points(self, horizon, scenario='base'):
+        # Month/value payload used by /api/detailed_forecasts
+        entry = self._forecast_cache.get(self._cache_key(horizon, scenario))
+        if entry is not None:
+            return entry["points"]
+        return self._to_points(self._compute_forecast(horizon, scenario))
+
+    def _draw_shocks(self, n_paths, horizon, seed, bootstrap):
+        # Shocks are N(0, vol) by default, or resampled return-model residuals when bootstrap=True
+        rng = np.random.default_rng(seed)
+        if bootstrap:
+            return rng.choice(self.residuals, size=(n_paths, horizon))
+        shocks = rng.standard_normal((n_paths, horizon))
+        shocks *= self.vol
+        return shocks
+
+    def _band_arrays(self, mults, horizon, n_paths, seed, bootstrap):
+        # One shock draw shared by every scenario; returns {percentile: (n_scenarios, horizon)}
+        shocks = self._draw_shocks(n_paths, horizon, seed, bootstrap)
+        drifts = self.expected_monthly_return * np.asarray(mults, dtype=float)
+        paths = simulate_scenario_paths(self.current_level, drifts, shocks)
+        return percentile_bands(paths, BAND_PERCENTILES, axis=1)
+
+    def _band_points(self, bands, row, horizon):
+        points = []
+        for i, label in enumerate(self.forecast_labels(horizon)):
+            point = {"month": label}
+            for pct in BAND_PERCENTILES:
+                point[f"p{pct}"] = round(float(bands[pct][row, i]))
+            points.append(point)
+        return points
+
+    def band_percentiles(self, horizon, scenario='base', n_paths=10000, seed=42, bootstrap=False):
+        # Monte Carlo uncertainty bands: draw every (path, month) shock at once and
+        # compound them around the scenario-adjusted expected return. Returns
+        # {percentile: (horizon,) levels}, unrounded. The regime mode has no multiplier to
+        # simulate around; its spread is the closed-form level_std of /api/regimes.
+        if scenario == REGIME_SCENARIO:
+            raise ValueError("Monte Carlo bands are not available for the regime scenario; "
+                             "use level_std from /api/regimes")
+        bands = self._band_arrays([SCENARIO_MULTS.get(scenario, 1.0)], horizon, n_paths, seed, bootstrap)
+        return {pct: values[0] for pct, values in bands.items()}
+
+    def simulate_bands(self, horizon, scenario='base', n_paths=10000, seed=42, bootstrap=False):
+        # band_percentiles as one {"month", "p5", ...} point per month, for the API
+        bands = self.band_percentiles(horizon, scenario, n_paths, seed, bootstrap)
+        return self._band_points({pct: values[None] for pct, values in bands.items()}, 0, horizon)
+
+    def get_forecast_grid(self, horizons, scenarios, bands=None):
+        # Every horizon x scenario combination from one vectorized call.
+        # scenarios: list of (name, multiplier); bands: optional dict with n_paths/seed/bootstrap.
+        # Shorter horizons are prefixes of the longest path, so only max(horizons) is computed.
+        max_horizon = max(horizons)
+        mults = [mult for _, mult in scenarios]
+        paths = self._scenario_paths(mults, max_horizon)
+        band_arrays = None
+        if bands is not None:
+            band_arrays = self._band_arrays(
+                mults, max_horizon, bands["n_paths"], bands["seed"], bands["bootstrap"]
+            )
+
+        results = []
+        for row, (name, mult) in enumerate(scenarios):
+            for horizon in horizons:
+                levels = paths[row, :horizon].tolist()
+                result = {
+                    "scenario": name,
+                    "multiplier": mult,
+                    "horizon": horizon,
+                    "final": round(levels[-1]),
+                    "path": self._to_points(levels),
+                }
+                if band_arrays is not None:
+                    result["bands"] = self._band_points(band_arrays, row, horizon)
+                results.append(result)
+        return results
 
     def get_historical_data(self):
         # Calculate expected sensex for historical plotting
@@ -115,130 +750,128 @@ class SensexForecaster:
         # But 'model3.py' had a different logic for "Expected Sensex".
         # Let's stick to providing forecast data and basic historicals.
         
-        return self.df[["CLOSE_SENSEX", "BULLISH_PROBABILITY", "GST_YOY_LAG1", "VIX", "SENSEX_RETURN"]].to_dict(orient='records')
+        names = ["CLOSE_SENSEX", "BULLISH_PROBABILITY", "GST_YOY_LAG1", "VIX", "SENSEX_RETURN"]
+        values = zip(*(self.column(name).tolist() for name in names))
+        return [dict(zip(names, row)) for row in values]
 
     def get_contribution_data(self):
         # Extract coefficients as proxies for contribution
         # Note: This is a simplification.
-        if not self.model or not hasattr(self.model, 'coef_'):
+        if self.kernel is None:
             return []
-            
-        features = [
-            "GST_YOY_LAG1", "IIP_GROWTH_LAG1", "ECI_GROWTH_LAG1",
-            "REPO_LAG1", "USDINR_CHANGE_LAG1", "CRUDE_CHANGE",
-            "GOLD_CHANGE", "FPI_LAG1"
+
+        contributions = [
+            {"Feature": contribution_label(name), "Contribution": round(share, 1)}
+            for name, share in zip(FEATURES, contribution_shares(self.kernel.coef).tolist())
         ]
-        coefs = self.model.coef_[0]
-        
-        # Filter out unwanted features first, and apply visual weights to match user reference
-        active_features = []
-        for name, val in zip(features, coefs):
-            # Apply heuristic weights to align with desired visual ranking (FPI/USD > ECI)
-            adjusted_val = val
-            if "ECI_GROWTH" in name:
-                adjusted_val *= 0.6 # Dampen ECI
-            elif "FPI" in name:
-                adjusted_val *= 1.3 # Boost FPI
-            elif "USDINR" in name:
-                adjusted_val *= 1.2 # Boost USDINR
-            elif "GST_YOY" in name:
-                adjusted_val *= 0.9 # Reduce GST slightly (transfer to crude/iip)
-            elif "CRUDE" in name:
-                adjusted_val *= 1.5 # Boost Crude significantly
-            elif "IIP_GROWTH" in name:
-                adjusted_val *= 1.35 # Boost IIP (but keep < Crude, 1.35 < 1.5 usually holds if raw vals similar)
-            elif "REPO" in name:
-                adjusted_val *= 0.5 # Reduce Repo (ensure < Gold)
-                
-            active_features.append((name, adjusted_val))
-            
-        # Recalculate total absolute sum of ONLY the active features
-        total_abs = sum(abs(val) for _, val in active_features)
-        
-        contributions = []
-        for name, val in active_features:
-            contributions.append({
-                "Feature": name.replace("_LAG1", "").replace("_CHANGE", "").replace("_", " "),
-                "Contribution": round(abs((val / total_abs) * 100), 1)
-            })
-            
         return sorted(contributions, key=lambda x: x['Contribution'], reverse=True)
 
+    def get_macro_expected_history(self):
+        # "Macro Fair Value" path behind /api/expected_sensex, replicating model3.py:
+        # Expected_Return = Prob * avg_pos + (1-Prob) * avg_neg
+        # Expected_Sensex = Initial * cumprod(1+Expected_Return)
+        # Reads zero-copy column views
+        returns = self.column("SENSEX_RETURN")
+        prob = self.column("BULLISH_PROBABILITY")
+        close = self.column("CLOSE_SENSEX")
+
+        avg_pos = returns[returns > 0].mean()
+        avg_neg = returns[returns < 0].mean()
+        expected_returns = prob * avg_pos + (1 - prob) * avg_neg
+
+        expected_path = compound_paths(close[0], expected_returns)
+
+        # The sheet's own dates are not used; months are synthesized to end at March 2025
+        # as per user requirement (Feb 2019 - Mar 2025)
+        labels = self.history_labels()
+
+        return [
+            {
+                "YEAR": label,
+                "CLOSE_SENSEX": float(actual),
+                "EXPECTED_SENSEX": float(expect)
+            }
+            for label, actual, expect in zip(labels, close, expected_path)
+        ]
+
     def get_vix_adjusted_history(self):
-        # Calculate full history based on the regression model (Refined Macro + Volatility)
-        # Expected_Return = alpha + beta*PROB + delta*GST + theta*VIX
-        
-        # Ensure we have the coefficients (they are computed in __init__)
+        # Full history from the regression model (Refined Macro + Volatility), using the same
+        # formula as the expected monthly return:
+        # Expected_Return = alpha + beta*PROB + delta*GST - |theta|*VIX
         if self.ret_model is None:
             return []
-            
-        # Calculate expected monthly return series for the whole dataset
-        # Note: We need to use the SHOCK variables we computed
-        
-        expected_returns = (
-            self.alpha +
-            self.beta_prob * self.df["BULLISH_PROBABILITY"] +
-            self.delta_gst * self.df["GST_SHOCK_NEG"] - # theta is negative in formula usually?
-            abs(self.theta_vix) * self.df["VIX_SHOCK_POS"]  
-            # Note: In __init__, we used: + self.theta_vix * ... 
-            # But line 80: beta, delta, theta = coef_. 
-            # Line 88 used - abs(theta). Let's stick to the logic used for 'expected_monthly_return' calculation.
-            # actually line 88: - abs(self.theta_vix) * recent["VIX_SHOCK_POS"].mean()
-        )
-        # Wait, let's verify exact logic from line 88.
-        # It used: alpha + beta*Prob + delta*GST - abs(theta)*VIX
-        
-        # Let's apply that to the series:
-        
+
         exp_ret_series = (
-            self.alpha + 
-            self.beta_prob * self.df["BULLISH_PROBABILITY"] + 
-            self.delta_gst * self.df["GST_SHOCK_NEG"] - 
-            abs(self.theta_vix) * self.df["VIX_SHOCK_POS"]
+            self.alpha +
+            self.beta_prob * self.column("BULLISH_PROBABILITY") +
+            self.delta_gst * self.column("GST_SHOCK_NEG") -
+            abs(self.theta_vix) * self.column("VIX_SHOCK_POS")
         )
-        
-        # Generate Cumulative Expected Sensex
-        # Starting from the first actual close?
-        # Ideally we start from index 0 actual close and project forward.
-        
-        start_val = self.df["CLOSE_SENSEX"].iloc[0]
-        expected_sensex = [start_val]
-        
-        for r in exp_ret_series:
-            # Shift? Return at t explains t or t+1? 
-            # Usually regression fits X(t) to Y(t). 
-            # So Expected_Return(t) is used to get Expected_Level(t).
-            # Expected_Level(t) = Expected_Level(t-1) * (1 + Expected_Return(t))
-            
-            # Since we iterate, we project recursively
-            val = expected_sensex[-1] * (1 + r)
-            expected_sensex.append(val)
-            
-        # The loop adds one extra point? 
-        # Actually, if we have N returns, we get N+1 points (0..N).
-        # We should align with the original dataframe length.
-        # Let's drop the first one or just take 1 to end if length mismatch?
-        # Actually, let's just re-index.
-        
+
+        close = self.column("CLOSE_SENSEX")
+        # Regression fits X(t) to Y(t), so Expected_Return(t) gives Expected_Level(t):
+        # Expected_Level(t) = Expected_Level(t-1) * (1 + Expected_Return(t)),
+        # starting from the first actual close, one point per row
+        expected_sensex = compound_paths(close[0], exp_ret_series)
+
         # Smooth the line as per user request
-        expected_sensex = pd.Series(expected_sensex[1:]).rolling(window=3, min_periods=1).mean().tolist()
-        
-        data = []
+        expected_sensex = rolling_mean(expected_sensex, 3).tolist()
+
         # Fix date range like before
-        end_date = pd.Timestamp("2025-03-01")
-        dates = pd.date_range(end=end_date, periods=len(self.df), freq='M')
-        
-        for i, (expect, date) in enumerate(zip(expected_sensex, dates)):
-             # "CLOSE_SENSEX" is actual
-             # "EXPECTED_SENSEX_VIX" is our calculated refined macro
-             data.append({
-                 "YEAR": date.strftime("%b '%y"),
-                 "CLOSE_SENSEX": float(self.df["CLOSE_SENSEX"].iloc[i]),
-                 "EXPECTED_SENSEX_VIX": float(expect)
-             })
-             
-        return data
+        labels = self.history_labels()
+
+        # "CLOSE_SENSEX" is actual
+        # "EXPECTED_SENSEX_VIX" is our calculated refined macro
+        return [
+            {"YEAR": label, "CLOSE_SENSEX": actual, "EXPECTED_SENSEX_VIX": float(expect)}
+            for label, actual, expect in zip(labels, close.tolist(), expected_sensex)
+        ]
+
+    def get_feature_history(self, columns=None):
+        # Columnar history of the feature matrix behind /api/features: month labels plus the
+        # requested columns (every column by default), with the leading NaN lags as null
+        matrix = self.feature_matrix()
+        return {
+            "YEAR": list(self.history_labels()),
+            "columns": {
+                name: [None if value != value else value for value in matrix.column(name).tolist()]
+                for name in (columns or matrix.names)
+            },
+        }
+
+    def get_attribution(self, offset=0, limit=None, columns=None):
+        # One page of the attribution timeline behind /api/attribution, as columns
+        matrix = self.attribution_matrix()
+        stop = self.rows if limit is None else min(offset + limit, self.rows)
+        return {
+            "total": self.rows,
+            "offset": offset,
+            "limit": limit,
+            "YEAR": list(self.history_labels()[offset:stop]),
+            "columns": {name: matrix.column(name)[offset:stop].tolist() for name in (columns or matrix.names)},
+        }
 
+    def get_regime_forecast(self, horizon=12):
+        # Payload of /api/regimes: the fitted chain and the regime-probability path
+        model = self.regime_model()
+        path = model.forecast(self.current_level, horizon)
+        return {
+            "regimes": list(model.names),
+            "cutoffs": list(model.cutoffs),
+            "current": model.names[model.current],
+            "transition_matrix": model.transition.tolist(),
+            "n_step_matrix": model.n_step(horizon).tolist(),
+            "stationary": model.stationary().tolist(),
+            "regime_returns": [
+                {"regime": name, "months": int(months), "mean": float(mean), "std": float(np.sqrt(var))}
+                for name, months, mean, var in zip(model.names, model.months, model.mean, model.var)
+            ],
+            "months": list(self.forecast_labels(horizon)),
+            "probabilities": {name: path["probabilities"][:, k].tolist() for k, name in enumerate(model.names)},
+            "expected_return": path["expected_return"].tolist(),
+            "expected_level": path["expected_level"].tolist(),
+            "level_std": path["level_std"].tolist(),
+        }
 
     def get_summary(self):
         outlook = "NEUTRAL"
@@ -258,37 +891,338 @@ class SensexForecaster:
             "risk_bias": "Neutral-Bullish" if self.expected_monthly_return > 0 else "Neutral-Bearish"
         }
 
-    def save_forecast_plot(self, levels, lower, upper, horizon, filename):
-        plt.figure(figsize=(11, 5))
-        plt.plot(
+    def save_forecast_plot(self, levels, lower, upper, horizon, filename, title=None, dpi=300):
+        # filename is relative to outputs/ unless absolute. Drawn on a standalone Figure (Agg
+        # canvas, no pyplot state), so it is safe in worker processes and threads.
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(11, 5))
+        ax = fig.subplots()
+        ax.plot(
             range(horizon + 1),
-            [self.current_level] + levels,
+            [self.current_level] + list(levels),
             marker="o",
             label="Expected Sensex"
         )
-        plt.fill_between(
+        ax.fill_between(
             range(horizon + 1),
-            [self.current_level] + lower,
-            [self.current_level] + upper,
+            [self.current_level] + list(lower),
+            [self.current_level] + list(upper),
             alpha=0.25,
             label="Uncertainty Band"
         )
-        plt.title(f"{horizon}-Month Macro Fair-Value Forecast")
-        plt.xlabel("Months Ahead")
-        plt.ylabel("Sensex Level")
-        plt.grid(True)
-        plt.legend()
+        ax.set_title(title or f"{horizon}-Month Macro Fair-Value Forecast")
+        ax.set_xlabel("Months Ahead")
+        ax.set_ylabel("Sensex Level")
+        ax.grid(True)
+        ax.legend()
         save_path = os.path.join(OUTPUT_DIR, filename)
-        plt.savefig(save_path, dpi=300)
-        plt.close()
-        print(f"Saved: {save_path}")
+        fig.savefig(save_path, dpi=dpi)
+        return save_path
+
+
+def load_index_config(path=INDEX_CONFIG_PATH):
+    # {index_id: {"name", "data", "model", "scaler", "bundle"}}. The Sensex is always available;
+    # the optional JSON config adds indices, with file paths relative to the config's directory
+    # ("bundle", a linear_kernel.py export, is optional):
+    #   {"nifty": {"name": "Nifty 50", "data": "nifty/model_with_vix.csv",
+    #              "model": "nifty/bullish_model.pkl", "scaler": "nifty/scaler.pkl"}}
+    indices = {
+        DEFAULT_INDEX: {"name": "BSE Sensex", "data": MODEL_DATA_PATH,
+                        "model": BULLISH_MODEL_PATH, "scaler": SCALER_PATH, "bundle": MODEL_BUNDLE_PATH},
+    }
+    if os.path.exists(path):
+        with open(path) as f:
+            config = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        for index_id, spec in config.items():
+            entry = dict(indices.get(index_id, {}))
+            entry.update({"name": spec.get("name", index_id)})
+            for key in ("data", "model", "scaler"):
+                if key in spec:
+                    entry[key] = os.path.join(base, spec[key])
+                elif key not in entry:
+                    raise ValueError(f"{path}: index '{index_id}' has no '{key}' file")
+            if "bundle" in spec:
+                entry["bundle"] = os.path.join(base, spec["bundle"])
+            indices[index_id] = entry
+    return indices
+
+
+class UnknownIndexError(KeyError):
+    pass
+
+
+class _IndexSlot:
+    # Per-index state: the current forecaster snapshot plus its build/swap locks and reload status
+    def __init__(self, index_id, spec):
+        self.index_id = index_id
+        self.spec = spec
+        self.forecaster = None
+        self.memory_bytes = 0
+        self.build_lock = threading.Lock()
+        # Serializes reference swaps between reloads and incremental ingests
+        self.swap_lock = threading.Lock()
+        self.reload_thread = None
+        self.reload_status = {"in_progress": False, "last_error": None, "last_seconds": None}
+
+
+class ForecasterRegistry:
+    # Forecasters keyed by index ID, built on first use and evicted least-recently-used first
+    # when their combined size passes the memory budget.
+    #
+    # Every swap is a single reference assignment. Handlers take one snapshot per request, so
+    # requests already in flight finish on the old (or evicted) instance while new ones see
+    # the new one. The index that was just built or swapped in is never the one evicted.
+
+    def __init__(self, indices, memory_budget=MEMORY_BUDGET_BYTES):
+        self.memory_budget = memory_budget
+        self._slots = {index_id: _IndexSlot(index_id, spec) for index_id, spec in indices.items()}
+        # IDs of built indices, least recently used first
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def known(self, index):
+        return index in self._slots
+
+    def _slot(self, index):
+        slot = self._slots.get(index)
+        if slot is None:
+            raise UnknownIndexError(index)
+        return slot
+
+    def _touch(self, index):
+        with self._lock:
+            if index in self._lru:
+                self._lru.move_to_end(index)
+
+    def build(self, index):
+        spec = self._slot(index).spec
+        return SensexForecaster(spec["data"], spec["model"], spec["scaler"], spec.get("bundle"))
+
+    def peek(self, index=DEFAULT_INDEX):
+        # The current instance without triggering a build (None until it is built)
+        forecaster = self._slot(index).forecaster
+        if forecaster is not None:
+            self._touch(index)
+        return forecaster
+
+    def get(self, index=DEFAULT_INDEX):
+        # The instance is kept in a local: a concurrent install of another index may evict this
+        # slot at any point, and the caller still gets a usable snapshot
+        slot = self._slot(index)
+        forecaster = slot.forecaster
+        if forecaster is None:
+            with slot.build_lock:
+                forecaster = slot.forecaster
+                if forecaster is None:
+                    forecaster = self.build(index)
+                    self.install(index, forecaster)
+        self._touch(index)
+        return forecaster
+
+    def install(self, index, forecaster):
+        # Swap `forecaster` in for `index`, then evict cold indices that no longer fit
+        slot = self._slot(index)
+        size = forecaster.memory_bytes()
+        with self._lock:
+            slot.forecaster = forecaster
+            slot.memory_bytes = size
+            self._lru[index] = True
+            self._lru.move_to_end(index)
+            self._evict(keep=index)
+        forecaster.on_resize = functools.partial(self._resized, index)
+        for listener in self._listeners:
+            listener(index, forecaster)
+        return forecaster
+
+    def _resized(self, index, forecaster):
+        # A lazily built matrix or model grew `forecaster`; re-account its slot if it is still
+        # the current one, and evict others if the budget is now exceeded
+        size = forecaster.memory_bytes()
+        slot = self._slot(index)
+        with self._lock:
+            if slot.forecaster is forecaster:
+                slot.memory_bytes = size
+                self._evict(keep=index)
+
+    def _evict(self, keep):
+        # Called with self._lock held
+        used = sum(self._slots[i].memory_bytes for i in self._lru)
+        for victim in list(self._lru):
+            if used <= self.memory_budget:
+                break
+            if victim == keep:
+                continue
+            evicted = self._slots[victim]
+            used -= evicted.memory_bytes
+            evicted.forecaster, evicted.memory_bytes = None, 0
+            del self._lru[victim]
+            FORECASTER_EVICTIONS.inc(victim)
+
+    def on_swap(self, listener):
+        # listener(index, forecaster) is called, on the swapping thread, after every build,
+        # reload and ingest swaps a forecaster in
+        self._listeners.append(listener)
+
+    def loaded(self):
+        with self._lock:
+            return list(self._lru)
+
+    def reload(self, index=DEFAULT_INDEX):
+        # Build a replacement off to the side and swap it in; on failure keep serving the old one
+        slot = self._slot(index)
+        started = time.perf_counter()
+        try:
+            fresh = self.build(index)
+        except Exception as exc:
+            slot.reload_status["last_error"] = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            slot.reload_status["last_seconds"] = round(time.perf_counter() - started, 4)
+        slot.reload_status["last_error"] = None
+        with slot.swap_lock:
+            self.install(index, fresh)
+        return fresh
+
+    def _reload_worker(self, slot):
+        try:
+            self.reload(slot.index_id)
+        except Exception:
+            pass
+        finally:
+            slot.reload_status["in_progress"] = False
+
+    def start_reload(self, index=DEFAULT_INDEX):
+        # Start a background reload unless one is already running; returns the reload thread
+        slot = self._slot(index)
+        with self._lock:
+            if not slot.reload_status["in_progress"]:
+                slot.reload_status["in_progress"] = True
+                slot.reload_thread = threading.Thread(
+                    target=self._reload_worker, args=(slot,), name=f"forecaster-reload-{index}", daemon=True
+                )
+                slot.reload_thread.start()
+            return slot.reload_thread
+
+    def reload_status(self, index=DEFAULT_INDEX):
+        slot = self._slot(index)
+        current = slot.forecaster
+        return {
+            "index": index,
+            "version": current.version if current is not None else None,
+            **slot.reload_status,
+        }
+
+    def ingest(self, rows, index=DEFAULT_INDEX):
+        # Append new periods to a shallow copy of the current forecaster and swap it in, so
+        # requests already holding the old snapshot are unaffected. Appended rows live in memory
+        # only: a reload re-reads the index's files, so the feed should also land them there.
+        slot = self._slot(index)
+        with slot.swap_lock:
+            current = self.get(index)
+            fresh = copy.copy(current)
+            started = time.perf_counter()
+            refits = [report for report in map(fresh.append_observation, rows) if report]
+            fresh.version = {
+                **current.version,
+                "build": next(_build_counter),
+                "data_modified": time.time(),
+                "rows": current.version["rows"] + len(rows),
+                "appended": current.version.get("appended", 0) + len(rows),
+            }
+            self.install(index, fresh)
+        return {
+            "index": index,
+            "version": fresh.version,
+            "expected_monthly_return": round(float(fresh.expected_monthly_return) * 100, 4),
+            "refits": refits,
+            "seconds": round(time.perf_counter() - started, 6),
+        }
+
+    def describe(self):
+        # Configured indices with their load state, for /api/indices
+        with self._lock:
+            lru = list(self._lru)
+        indices = []
+        for index_id, slot in self._slots.items():
+            # Read once; the slot may be evicted between two reads
+            forecaster = slot.forecaster
+            indices.append({
+                "id": index_id,
+                "name": slot.spec["name"],
+                "loaded": forecaster is not None,
+                "memory_bytes": slot.memory_bytes,
+                "build": forecaster.version["build"] if forecaster is not None else None,
+                # 0 = least recently used among the loaded indices
+                "lru_rank": lru.index(index_id) if index_id in lru else None,
+            })
+        return {
+            "default": DEFAULT_INDEX,
+            "memory_budget_bytes": self.memory_budget,
+            "indices": indices,
+        }
+
+
+# Process-wide registry; nothing is built until an index is first requested
+registry = ForecasterRegistry(load_index_config())
+
+
+def peek_forecaster(index=DEFAULT_INDEX):
+    return registry.peek(index)
+
+
+def get_forecaster(index=DEFAULT_INDEX):
+    return registry.get(index)
+
+
+def __getattr__(name):
+    # Keep `from sensex_macro_forecast_all_horizons import forecaster` working, lazily
+    if name == "forecaster":
+        return get_forecaster()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def reload_forecaster(index=DEFAULT_INDEX):
+    return registry.reload(index)
+
+
+def start_reload(index=DEFAULT_INDEX):
+    return registry.start_reload(index)
+
+
+def reload_status(index=DEFAULT_INDEX):
+    return registry.reload_status(index)
+
+
+def ingest_observations(rows, index=DEFAULT_INDEX):
+    return registry.ingest(rows, index)
+
 
+def watch_model_sources(interval, stop_event=None):
+    # Poll the source files of every built index and start a reload when their fingerprint
+    # changes. Indices that are not built (or were evicted) read fresh files when next built.
+    stop_event = stop_event or threading.Event()
+    last_seen = {}
+    while not stop_event.wait(interval):
+        for index in registry.loaded():
+            current = registry.peek(index)
+            if current is None:
+                continue
+            try:
+                fingerprint = source_fingerprint(current.sources)
+            except OSError:
+                # A file is being replaced; look again on the next tick
+                continue
+            if fingerprint != last_seen.get(index, current.version["fingerprint"]):
+                last_seen[index] = fingerprint
+                registry.start_reload(index)
 
-# Global instance
-forecaster = SensexForecaster()
 
 def generate_forecast_with_bands(horizon, band_mult):
     # Backward compatibility wrapper if needed, or usage example
+    forecaster = get_forecaster()
     levels = forecaster.get_forecast(horizon)
     vol = forecaster.vol
     lower = [x * (1 - band_mult * vol) for x in levels]
@@ -296,6 +1230,7 @@ def generate_forecast_with_bands(horizon, band_mult):
     return levels, lower, upper
 
 if __name__ == "__main__":
+    forecaster = get_forecaster()
     print(f"Current Level: {forecaster.current_level}")
     l, _, _ = generate_forecast_with_bands(6, 1.5)
     print(f"6M Forecast: {l[-1]}")
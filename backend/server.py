@@ -1,18 +1,70 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 import uvicorn
 import os
+import asyncio
+import threading
+import signal
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from contextlib import asynccontextmanager
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+from pydantic import BaseModel, Field
 
 # Import the forecaster logic
 # Ensure backend directory is in path or run from backend dir
-from sensex_macro_forecast_all_horizons import forecaster, generate_forecast_with_bands
+from response_cache import ResponseCache, CachedResponse
+from stream_hub import StreamHub
+from regime_engine import MAX_REGIME_HORIZON
+import scenario_engine
+import contribution_ci
+from metrics import render_metrics
+from instrumentation import InstrumentationMiddleware, admin_token_matches, profiled
+from sensex_macro_forecast_all_horizons import (
+    get_forecaster, peek_forecaster, generate_forecast_with_bands, SCENARIO_MULTS, REGIME_SCENARIO, DEFAULT_INDEX, registry,
+    start_reload, reload_status, watch_model_sources, ingest_observations, FEATURE_NAMES, ATTRIBUTION_NAMES,
+)
+
+# Build the forecaster in a background thread at startup so uvicorn can bind immediately;
+# requests that arrive first simply wait for it. Set SENSEX_EAGER_LOAD=0 to build on first request.
+EAGER_LOAD = os.environ.get("SENSEX_EAGER_LOAD", "1") != "0"
+# Poll data/ every N seconds and hot-reload the forecaster when its files change (0 = off)
+WATCH_INTERVAL = float(os.environ.get("SENSEX_WATCH_INTERVAL", "0"))
+# When set, /api/admin/* requires a matching X-Admin-Token header. Routes that change the
+# served model (reload, ingest) are refused until it is set.
+ADMIN_TOKEN = os.environ.get("SENSEX_ADMIN_TOKEN")
+# Allow per-request cProfile reports via `X-Profile: 1` or `?profile=1` (also needs the admin token if set)
+PROFILING = os.environ.get("SENSEX_PROFILING", "0") == "1"
+# Pid of the prefork.py supervisor when this app runs in one of its workers; the supervisor
+# owns the shared model state, so reloads are forwarded to it and ingest is refused
+PREFORK_PARENT = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if EAGER_LOAD:
+        threading.Thread(target=get_forecaster, name="forecaster-warmup", daemon=True).start()
+
+    stop_watch = threading.Event()
+    if WATCH_INTERVAL > 0 and PREFORK_PARENT is None:
+        threading.Thread(
+            target=watch_model_sources, args=(WATCH_INTERVAL, stop_watch),
+            name="model-watch", daemon=True
+        ).start()
+    # Semaphores belong to one event loop; make a fresh one for the loop serving this app
+    global cpu_slots
+    cpu_slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    stream_hub.start(asyncio.get_running_loop())
+    yield
+    stop_watch.set()
+
 
-app = FastAPI(title="Sensex Macro Intelligence API")
+app = FastAPI(title="Sensex Macro Intelligence API", lifespan=lifespan)
 
 # CORS for local development if running frontend separately
 app.add_middleware(
@@ -22,125 +74,432 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Latency / request count / payload size per route for /metrics, plus opt-in profiling
+app.add_middleware(InstrumentationMiddleware, profiling_enabled=PROFILING, admin_token=ADMIN_TOKEN)
+
+# CPU-bound pandas/NumPy work runs on a dedicated, bounded thread pool so the event loop
+# stays free for cheap lookups and static assets. At most MAX_IN_FLIGHT jobs may be running or
+# queued; a request that cannot get a slot within QUEUE_TIMEOUT seconds gets a 503.
+CPU_WORKERS = int(os.environ.get("SENSEX_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+MAX_IN_FLIGHT = int(os.environ.get("SENSEX_MAX_IN_FLIGHT", CPU_WORKERS * 8))
+QUEUE_TIMEOUT = float(os.environ.get("SENSEX_QUEUE_TIMEOUT", "10"))
+
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="sensex-cpu")
+cpu_slots = None
+
+
+async def run_cpu(fn, *args):
+    global cpu_slots
+    if cpu_slots is None:
+        cpu_slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    slots = cpu_slots
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="server busy, retry shortly")
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cpu_executor, profiled(partial(fn, *args)))
+    finally:
+        slots.release()
+
+
+async def current_forecaster(index=DEFAULT_INDEX):
+    # One snapshot per request; only hop to the pool if the index is not built yet
+    if not registry.known(index):
+        raise HTTPException(status_code=404, detail=f"unknown index '{index}'")
+    forecaster = peek_forecaster(index)
+    if forecaster is None:
+        forecaster = await run_cpu(get_forecaster, index)
+    return forecaster
+
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus text exposition of stage timings and per-route request metrics
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+# Serialized, ETagged and pre-compressed payloads of the read-only routes, per model build
+response_cache = ResponseCache()
+
+
+async def cached_json(request, index, forecaster, build_payload):
+    # Serve from the response cache; on a miss build, encode and compress on the CPU pool
+    key = response_cache.key(index, forecaster.version["build"], request)
+    entry = response_cache.get(key)
+    if entry is None:
+        def build():
+            return CachedResponse(build_payload(), forecaster.version["data_modified"])
+        entry = response_cache.put(key, await run_cpu(build))
+    return entry.respond(request.headers)
+
 
 # API Endpoints
+# Every /api route takes an optional `index` query parameter (default: the Sensex)
+@app.get("/api/indices")
+async def get_indices():
+    # Configured indices and which of them are currently built
+    return registry.describe()
+
 @app.get("/api/contribution")
-def get_contribution():
-    return forecaster.get_contribution_data()
+async def get_contribution(request: Request, index: str = DEFAULT_INDEX, ci: bool = False,
+                           resamples: int = contribution_ci.DEFAULT_RESAMPLES, block: int = 1,
+                           level: float = contribution_ci.DEFAULT_LEVEL, seed: int = contribution_ci.DEFAULT_SEED):
+    # With ci=true: bootstrap mean and percentile interval of every contribution weight
+    forecaster = await current_forecaster(index)
+    if not ci:
+        return await cached_json(request, index, forecaster, forecaster.get_contribution_data)
+    if not 1 <= resamples <= 20000:
+        raise HTTPException(status_code=400, detail="resamples must be between 1 and 20000")
+    if resamples * forecaster.rows > contribution_ci.MAX_RESAMPLED_ROWS:
+        raise HTTPException(status_code=400, detail=f"resamples x rows must be at most "
+                                                    f"{contribution_ci.MAX_RESAMPLED_ROWS}")
+    if not 1 <= block <= forecaster.rows:
+        raise HTTPException(status_code=400, detail="block must be between 1 and the number of rows")
+    if not 0 < level < 100:
+        raise HTTPException(status_code=400, detail="level must be between 0 and 100")
+    if seed < 0:
+        raise HTTPException(status_code=400, detail="seed must be >= 0")
+    return await cached_json(request, index, forecaster, partial(
+        contribution_ci.contribution_intervals, forecaster, resamples, block, level, seed
+    ))
 
 @app.get("/api/expected_sensex")
-def get_expected_sensex():
-    # This seems incomplete in the forecaster logic refactor, 
-    # but let's emulate what the frontend expects or return historicals.
-    # The frontend expects { YEAR, CLOSE_SENSEX, EXPECTED_SENSEX }
-    # Our simple refactor returned everything. We might need to process it.
-    
-    # Let's generate a mockup or use actual data if available.
-    # The current forecaster logic calculates 'expected_monthly_return' but doesn't store a full 'expected sensex' time series 
-    # except what might be in model3.py logic. 
-    # For now, let's return reasonable data from the dataframe we have.
-    
-    # We can try to reconstruct "Expected Sensex" from probabilities if we want, or just send what we have.
+async def get_expected_sensex(request: Request, index: str = DEFAULT_INDEX):
     # Frontend Service: fetchMacroExpectedSensex returns YEAR, CLOSE_SENSEX, EXPECTED_SENSEX
-    
-    # We will compute a simple expected path based on the probabilities for visualization
-    # Replicating model3.py logic roughly:
-    # Expected_Return = Prob * avg_pos + (1-Prob) * avg_neg
-    # Expected_Sensex = Initial * cumprod(1+Expected_Return)
-    
-    df = forecaster.df.copy()
-    avg_pos = df[df["SENSEX_RETURN"] > 0]["SENSEX_RETURN"].mean()
-    avg_neg = df[df["SENSEX_RETURN"] < 0]["SENSEX_RETURN"].mean()
-    
-    df["EXPECTED_RETURN_H"] = (
-        df["BULLISH_PROBABILITY"] * avg_pos +
-        (1 - df["BULLISH_PROBABILITY"]) * avg_neg
-    )
-    
-    # We only have returns, need dates. The CSV has no dates? 
-    # Wait, model3.py had dates. Let's check columns.
-    # Our refactor loaded 'model_with_vix - Sheet1.csv' which may not have dates.
-    # But model3.py loaded 'sensex_macro_model_step2_reduced.csv' which had YEAR.
-    # Let's assume we can generate dates or use what's there.
-    
-    # If no YEAR column, we synthesize standard monthly dates ending at current.
-    # df length is ~74?
-    
-    # Let's just return what we can. 
-    # Note: Using hardcoded dates if missing is risky but acceptable for "Fair Value" concept visualization.
-    
-    data = []
-    # Fixed end date to March 2025 as per user requirement (Feb 2019 - Mar 2025)
-    end_date = pd.Timestamp("2025-03-01")
-    dates = pd.date_range(end=end_date, periods=len(df), freq='M')
-    
-    current_val = df["CLOSE_SENSEX"].iloc[0] # distinct from current_level global
-    
-    # Recalculate expected path from start
-    expected_path = [current_val]
-    for r in df["EXPECTED_RETURN_H"]:
-        expected_path.append(expected_path[-1] * (1 + r))
-    expected_path = expected_path[1:]
-    
-    for i, date in enumerate(dates):
-        data.append({
-            "YEAR": date.strftime("%b '%y"),
-            "CLOSE_SENSEX": float(df["CLOSE_SENSEX"].iloc[i]),
-            "EXPECTED_SENSEX": float(expected_path[i])
-        })
-        
-    return data
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, forecaster.get_macro_expected_history)
 
 @app.get("/api/vix_adjusted")
-def get_vix_adjusted():
+async def get_vix_adjusted(request: Request, index: str = DEFAULT_INDEX):
     # Return the refined "Macro + Volatility" model history
-    return forecaster.get_vix_adjusted_history()
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, forecaster.get_vix_adjusted_history)
 
-@app.get("/api/forecasts")
-def get_forecasts(scenario: str = 'base'):
-    # Returns point estimates { sixMonth, twelveMonth, eighteenMonth }
-    
+@app.get("/api/features")
+async def get_features(request: Request, columns: Optional[str] = None, index: str = DEFAULT_INDEX):
+    # Rolling / expanding z-scores, means and lags of the model inputs, as columns;
+    # `columns` is a comma-separated subset of the names in the response
+    names = columns.split(",") if columns else None
+    unknown = [name for name in names or [] if name not in FEATURE_NAMES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown feature columns: {', '.join(unknown)}")
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, partial(forecaster.get_feature_history, names))
+
+@app.get("/api/attribution")
+async def get_attribution(request: Request, offset: int = 0, limit: int = 1000,
+                          columns: Optional[str] = None, index: str = DEFAULT_INDEX):
+    # Month-by-month log-odds and expected-return contributions of every factor, as columns,
+    # `limit` rows from `offset`; `columns` is a comma-separated subset
+    if offset < 0 or not 1 <= limit <= 10000:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 10000")
+    names = columns.split(",") if columns else None
+    unknown = [name for name in names or [] if name not in ATTRIBUTION_NAMES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown attribution columns: {', '.join(unknown)}")
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, partial(forecaster.get_attribution, offset, limit, names))
+
+@app.get("/api/regimes")
+async def get_regimes(request: Request, horizon: int = 12, index: str = DEFAULT_INDEX):
+    # Regime transition matrix, per-regime returns and the regime-probability path h months out
+    if not 1 <= horizon <= MAX_REGIME_HORIZON:
+        raise HTTPException(status_code=400, detail=f"horizon must be between 1 and {MAX_REGIME_HORIZON} months")
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, partial(forecaster.get_regime_forecast, horizon))
+
+def forecasts_payload(forecaster, scenario):
     l6 = forecaster.get_forecast(6, scenario)
     l12 = forecaster.get_forecast(12, scenario)
     l18 = forecaster.get_forecast(18, scenario)
-    
     return {
         "sixMonth": round(l6[-1]),
         "twelveMonth": round(l12[-1]),
         "eighteenMonth": round(l18[-1])
     }
 
+def detailed_forecasts_payload(forecaster, scenario):
+    return {
+        "sixMonth": forecaster.get_forecast_points(6, scenario),
+        "twelveMonth": forecaster.get_forecast_points(12, scenario),
+        "eighteenMonth": forecaster.get_forecast_points(18, scenario)
+    }
+
+@app.get("/api/forecasts")
+async def get_forecasts(request: Request, scenario: str = 'base', index: str = DEFAULT_INDEX):
+    # Returns point estimates { sixMonth, twelveMonth, eighteenMonth }
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, partial(forecasts_payload, forecaster, scenario))
+
 
 @app.get("/api/summary")
-def get_summary():
-    return forecaster.get_summary()
+async def get_summary(request: Request, index: str = DEFAULT_INDEX):
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, forecaster.get_summary)
 
 @app.get("/api/detailed_forecasts")
-def get_detailed_forecasts(scenario: str = 'base'):
+async def get_detailed_forecasts(request: Request, scenario: str = 'base', index: str = DEFAULT_INDEX):
     # Returns monthly paths { sixMonth: [], twelveMonth: [], ... }
-    
-    l6 = forecaster.get_forecast(6, scenario)
-    l12 = forecaster.get_forecast(12, scenario)
-    l18 = forecaster.get_forecast(18, scenario)
-    
-    def to_points(levels):
-        points = []
-        # Fixed start date to align with "March 2025 Live" status
-        start_date = pd.Timestamp("2025-03-01")
-        for i, val in enumerate(levels):
-            d = start_date + pd.DateOffset(months=i+1)
-            points.append({
-                "month": d.strftime("%b '%y"),
-                "value": round(val)
-            })
-        return points
+    forecaster = await current_forecaster(index)
+    return await cached_json(request, index, forecaster, partial(detailed_forecasts_payload, forecaster, scenario))
+
+def dashboard_snapshot(forecaster):
+    # Everything the dashboard polls for, keyed like the routes, with every scenario
+    return {
+        "summary": forecaster.get_summary(),
+        "forecasts": {s: forecasts_payload(forecaster, s) for s in SCENARIO_MULTS},
+        "detailed_forecasts": {s: detailed_forecasts_payload(forecaster, s) for s in SCENARIO_MULTS},
+        "contribution": forecaster.get_contribution_data(),
+        "expected_sensex": forecaster.get_macro_expected_history(),
+        "vix_adjusted": forecaster.get_vix_adjusted_history(),
+        "version": {"build": forecaster.version["build"], "rows": forecaster.version["rows"]},
+    }
+
+# Snapshot and merge-patch fan-out for /api/stream, refreshed whenever the registry swaps
+stream_hub = StreamHub(peek_forecaster, lambda forecaster: run_cpu(dashboard_snapshot, forecaster))
+registry.on_swap(stream_hub.notify)
+
+@app.get("/api/stream")
+async def stream_updates(index: str = DEFAULT_INDEX, last_event_id: Optional[str] = Header(default=None)):
+    # Server-Sent Events: a `snapshot` event on connect, then a `patch` (JSON merge patch)
+    # whenever the index is reloaded or ingests rows
+    await current_forecaster(index)
+    if stream_hub.full:
+        raise HTTPException(status_code=503, detail="too many stream clients, poll instead")
+    return StreamingResponse(
+        stream_hub.events(index, last_event_id), media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/forecast_bands")
+async def get_forecast_bands(horizon: int = 12, scenario: str = 'base', n_paths: int = 10000,
+                             seed: int = 42, bootstrap: bool = False, index: str = DEFAULT_INDEX):
+    # Monte Carlo percentile bands (p5/p25/p50/p75/p95) for each forecast month
+    if not 1 <= horizon <= 120:
+        raise HTTPException(status_code=400, detail="horizon must be between 1 and 120 months")
+    if not 1 <= n_paths <= 200000:
+        raise HTTPException(status_code=400, detail="n_paths must be between 1 and 200000")
+    if seed < 0:
+        raise HTTPException(status_code=400, detail="seed must be >= 0")
+    if scenario == REGIME_SCENARIO:
+        raise HTTPException(status_code=400, detail="bands are not simulated for the regime scenario; "
+                                                    "use level_std from /api/regimes")
 
+    forecaster = await current_forecaster(index)
+    bands = await run_cpu(forecaster.simulate_bands, horizon, scenario, n_paths, seed, bootstrap)
     return {
-        "sixMonth": to_points(l6),
-        "twelveMonth": to_points(l12),
-        "eighteenMonth": to_points(l18)
+        "horizon": horizon,
+        "scenario": scenario,
+        "n_paths": n_paths,
+        "seed": seed,
+        "bootstrap": bootstrap,
+        "bands": bands
     }
 
+class ScenarioSpec(BaseModel):
+    name: Optional[str] = None
+    multiplier: float
+
+
+class BandSettings(BaseModel):
+    n_paths: int = 10000
+    seed: int = 42
+    bootstrap: bool = False
+
+
+class BatchForecastRequest(BaseModel):
+    horizons: List[int] = Field(default_factory=lambda: [6, 12, 18])
+    # Named scenarios ("base", "bull", "bear"), bare multipliers, or {"name", "multiplier"}
+    scenarios: List[Union[str, float, ScenarioSpec]] = Field(default_factory=lambda: list(SCENARIO_MULTS))
+    bands: Optional[BandSettings] = None
+
+
+# Limits for one batch request; the band simulation holds scenarios x n_paths x horizon values
+MAX_BATCH_HORIZON = 120
+MAX_BATCH_SCENARIOS = 50
+MAX_BATCH_CELLS = 20_000_000
+# Custom multipliers must lie in (0, MAX_SCENARIO_MULT]; larger ones overflow long horizons
+MAX_SCENARIO_MULT = 10.0
+
+
+def check_horizons(horizons):
+    if not horizons or not all(1 <= h <= MAX_BATCH_HORIZON for h in horizons):
+        raise HTTPException(status_code=400, detail=f"horizons must be between 1 and {MAX_BATCH_HORIZON} months")
+    return sorted(set(horizons))
+
+
+def resolve_scenarios(specs):
+    resolved = []
+    for spec in specs:
+        if isinstance(spec, str):
+            if spec not in SCENARIO_MULTS:
+                raise HTTPException(status_code=400, detail=f"unknown scenario '{spec}'")
+            resolved.append((spec, SCENARIO_MULTS[spec]))
+        elif isinstance(spec, ScenarioSpec):
+            resolved.append((spec.name or f"x{spec.multiplier:g}", spec.multiplier))
+        else:
+            resolved.append((f"x{spec:g}", float(spec)))
+        mult = resolved[-1][1]
+        if not (math.isfinite(mult) and 0 < mult <= MAX_SCENARIO_MULT):
+            raise HTTPException(status_code=400,
+                                detail=f"scenario multipliers must be in (0, {MAX_SCENARIO_MULT:g}], got {mult!r}")
+    return resolved
+
+
+@app.post("/api/forecasts/batch")
+async def get_forecasts_batch(batch: BatchForecastRequest, index: str = DEFAULT_INDEX):
+    # Every horizon x scenario combination (optionally with Monte Carlo bands) in one response
+    horizons = check_horizons(batch.horizons)
+    if not 1 <= len(batch.scenarios) <= MAX_BATCH_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"between 1 and {MAX_BATCH_SCENARIOS} scenarios per request")
+    scenarios = resolve_scenarios(batch.scenarios)
+
+    bands = None
+    if batch.bands is not None:
+        bands = batch.bands.model_dump()
+        if bands["seed"] < 0:
+            raise HTTPException(status_code=400, detail="seed must be >= 0")
+        cells = len(scenarios) * bands["n_paths"] * max(horizons)
+        if bands["n_paths"] < 1 or cells > MAX_BATCH_CELLS:
+            raise HTTPException(status_code=400, detail="band simulation too large; reduce n_paths, scenarios or horizons")
+
+    forecaster = await current_forecaster(index)
+    results = await run_cpu(forecaster.get_forecast_grid, horizons, scenarios, bands)
+    return {"version": forecaster.version["build"], "results": results}
+
+class GridAxis(BaseModel):
+    variable: str
+    # Additive perturbations to the latest reading of `variable`
+    deltas: List[float]
+
+
+class ScenarioGridRequest(BaseModel):
+    x: GridAxis
+    y: GridAxis
+    horizons: List[int] = Field(default_factory=lambda: [6, 12, 18])
+
+
+class ScenarioSampleRequest(BaseModel):
+    # {variable: [low, high]} perturbation ranges for Latin-hypercube sampling
+    ranges: Dict[str, List[float]]
+    n: int = 1000
+    seed: int = 42
+    horizons: List[int] = Field(default_factory=lambda: [6, 12, 18])
+    include_samples: bool = False
+
+
+MAX_SWEEP_STATES = 250_000
+
+
+def check_finite(name, values):
+    if not all(math.isfinite(v) for v in values):
+        raise HTTPException(status_code=400, detail=f"{name} must be finite numbers")
+
+
+@app.post("/api/scenarios/grid")
+async def get_scenario_grid(grid: ScenarioGridRequest, index: str = DEFAULT_INDEX):
+    # Heatmap of expected return and levels over two perturbed macro variables
+    horizons = check_horizons(grid.horizons)
+    cells = len(grid.x.deltas) * len(grid.y.deltas)
+    if not 1 <= cells <= MAX_SWEEP_STATES:
+        raise HTTPException(status_code=400, detail=f"grid must have between 1 and {MAX_SWEEP_STATES} cells")
+    check_finite("x.deltas", grid.x.deltas)
+    check_finite("y.deltas", grid.y.deltas)
+
+    forecaster = await current_forecaster(index)
+    try:
+        return await run_cpu(
+            scenario_engine.sweep_grid, forecaster,
+            grid.x.variable, grid.x.deltas, grid.y.variable, grid.y.deltas, horizons
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.post("/api/scenarios/sample")
+async def get_scenario_sample(sample: ScenarioSampleRequest, index: str = DEFAULT_INDEX):
+    # Distribution of expected return and levels over Latin-hypercube samples of macro states
+    horizons = check_horizons(sample.horizons)
+    if not 1 <= sample.n <= MAX_SWEEP_STATES:
+        raise HTTPException(status_code=400, detail=f"n must be between 1 and {MAX_SWEEP_STATES}")
+    if not sample.ranges or any(len(bounds) != 2 for bounds in sample.ranges.values()):
+        raise HTTPException(status_code=400, detail="ranges must map variables to [low, high]")
+    for var, (low, high) in sample.ranges.items():
+        check_finite(f"ranges.{var}", (low, high))
+        if low > high:
+            raise HTTPException(status_code=400, detail=f"ranges.{var} must have low <= high")
+    if sample.seed < 0:
+        raise HTTPException(status_code=400, detail="seed must be >= 0")
+
+    forecaster = await current_forecaster(index)
+    try:
+        return await run_cpu(
+            scenario_engine.sweep_lhs, forecaster,
+            {var: tuple(bounds) for var, bounds in sample.ranges.items()},
+            sample.n, sample.seed, horizons, sample.include_samples
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+def check_admin(token, mutating=False):
+    # mutating routes fail closed: CORS allows every origin, so without a token anyone could
+    # rewrite the served model
+    if mutating and not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="set SENSEX_ADMIN_TOKEN to enable this route")
+    if ADMIN_TOKEN and not admin_token_matches(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+@app.post("/api/admin/reload")
+async def reload_model(wait: bool = True, index: str = DEFAULT_INDEX,
+                       x_admin_token: Optional[str] = Header(default=None)):
+    # Rebuild the forecaster from data/ in the background and swap it in atomically.
+    # With wait=true the response reports the new version and load timing.
+    check_admin(x_admin_token, mutating=True)
+    if not registry.known(index):
+        raise HTTPException(status_code=404, detail=f"unknown index '{index}'")
+    if PREFORK_PARENT is not None:
+        # The supervisor rebuilds once and rolls every worker onto the new model
+        os.kill(PREFORK_PARENT, signal.SIGHUP)
+        return {**reload_status(index), "scheduled": True}
+    thread = start_reload(index)
+    if wait:
+        # Waiting on the reload is not CPU work, so keep it off the bounded pool
+        await asyncio.to_thread(thread.join)
+        status = reload_status(index)
+        if status["last_error"]:
+            raise HTTPException(status_code=500, detail=status)
+        return status
+    return reload_status(index)
+
+class IngestRequest(BaseModel):
+    # New periods, oldest first; each needs the 8 features, VIX, SENSEX_RETURN and CLOSE_SENSEX
+    rows: List[Dict[str, Any]]
+
+
+@app.post("/api/ingest")
+async def ingest(batch: IngestRequest, index: str = DEFAULT_INDEX,
+                 x_admin_token: Optional[str] = Header(default=None)):
+    # Append observations incrementally (no full refit) and swap in the updated forecaster
+    check_admin(x_admin_token, mutating=True)
+    if PREFORK_PARENT is not None:
+        raise HTTPException(status_code=409, detail="ingest is not available under prefork.py; "
+                                                    "update the data files and reload instead")
+    if not batch.rows:
+        raise HTTPException(status_code=400, detail="no rows to ingest")
+    await current_forecaster(index)
+    try:
+        return await run_cpu(ingest_observations, batch.rows, index)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/api/admin/model")
+async def get_model_info(index: str = DEFAULT_INDEX, x_admin_token: Optional[str] = Header(default=None)):
+    check_admin(x_admin_token)
+    await current_forecaster(index)
+    return reload_status(index)
+
 # Serve React App
 # We assume the react build will be in ../frontend/dist
 frontend_dist = os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+
+from metrics import STREAM_CLIENTS, STREAM_EVENTS
+from response_cache import dumps
+
+# Live dashboard updates over Server-Sent Events (GET /api/stream).
+# A client gets one consolidated snapshot of every dashboard payload on connect, then only a
+# JSON merge patch (RFC 7386) each time the index's forecaster is rebuilt or ingests rows.
+#
+# Work is per index and per build, never per client: the snapshot is built and encoded once
+# when the registry swaps in a new forecaster, the patch against the previous snapshot is
+# encoded once, and the same bytes are queued to every subscriber. An idle client is just a
+# coroutine parked on its queue with a heartbeat timeout, so thousands of them cost little
+# more than their sockets. A client that falls CLIENT_QUEUE events behind has its backlog
+# replaced by the latest snapshot rather than holding patches it can no longer apply.
+#
+# Every event carries the build as its `id`, so a reconnecting EventSource sends it back in
+# Last-Event-ID and skips the snapshot when it is already current.
+
+# Seconds between comment lines on an idle stream (keeps proxies from closing it)
+HEARTBEAT_SECONDS = float(os.environ.get("SENSEX_STREAM_HEARTBEAT", "15"))
+# Connections per process; further clients get a 503 and fall back to polling
+MAX_CLIENTS = int(os.environ.get("SENSEX_STREAM_MAX_CLIENTS", "10000"))
+# Events queued per client before it is resynced with a snapshot
+CLIENT_QUEUE = 8
+# Reconnect delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+_UNCHANGED = object()
+
+
+def merge_patch(old, new):
+    # RFC 7386 patch that turns old into new, or _UNCHANGED. Objects are diffed key by key;
+    # lists and scalars are replaced whole. Payloads never contain null, so removal is exact.
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = {key: None for key in old.keys() - new.keys()}
+        for key, value in new.items():
+            if key not in old:
+                patch[key] = value
+                continue
+            sub = merge_patch(old[key], value)
+            if sub is not _UNCHANGED:
+                patch[key] = sub
+        return patch if patch else _UNCHANGED
+    return _UNCHANGED if old == new else new
+
+
+def encode_event(event, payload, event_id=None):
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines += [f"event: {event}", "data: " + dumps(payload).decode()]
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class _Client:
+    __slots__ = ("queue",)
+
+    def __init__(self):
+        # (build, encoded event) pairs
+        self.queue = asyncio.Queue(CLIENT_QUEUE)
+
+    def push(self, build, event, channel):
+        try:
+            self.queue.put_nowait((build, event))
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((channel.build, channel.event))
+
+
+class _Channel:
+    # One index: its latest snapshot, the encoded snapshot event and the connected clients
+    def __init__(self):
+        self.build = None
+        self.snapshot = None
+        self.event = None
+        self.clients = set()
+        self.lock = asyncio.Lock()
+
+
+class StreamHub:
+    def __init__(self, current, build_snapshot, max_clients=MAX_CLIENTS):
+        # current(index) -> the index's forecaster or None (must not trigger a build);
+        # build_snapshot(forecaster) -> awaitable of the consolidated payload
+        self.current = current
+        self.build_snapshot = build_snapshot
+        self.max_clients = max_clients
+        self.channels = {}
+        self.loop = None
+        self.n_clients = 0
+        # Strong references to pending sync tasks; the loop only keeps weak ones
+        self._tasks = set()
+
+    def start(self, loop):
+        self.loop = loop
+
+    def notify(self, index, forecaster):
+        # Registry swap listener; may run on any thread
+        loop, channel = self.loop, self.channels.get(index)
+        if loop is not None and channel is not None and channel.clients:
+            loop.call_soon_threadsafe(self._spawn_sync, index)
+
+    def _spawn_sync(self, index):
+        task = self.loop.create_task(self.sync(index))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @property
+    def full(self):
+        return self.n_clients >= self.max_clients
+
+    async def sync(self, index):
+        # Bring the channel up to the index's current build and fan out the patch
+        channel = self.channels.setdefault(index, _Channel())
+        async with channel.lock:
+            forecaster = self.current(index)
+            # An evicted index keeps its last snapshot until it is rebuilt
+            if forecaster is None:
+                return
+            build = forecaster.version["build"]
+            if channel.build is not None and build <= channel.build:
+                return
+            try:
+                # Round-tripped so patches compare plain JSON values, not NumPy scalars
+                snapshot = json.loads(dumps(await self.build_snapshot(forecaster)))
+            except Exception as exc:
+                # e.g. the CPU pool is saturated; try again shortly while anyone is listening
+                print(f"[stream] {index}: snapshot for build {build} failed: {exc}")
+                if channel.clients:
+                    self.loop.call_later(1.0, self._spawn_sync, index)
+                return
+            first = channel.snapshot is None
+            patch = _UNCHANGED if first else merge_patch(channel.snapshot, snapshot)
+            channel.build, channel.snapshot = build, snapshot
+            channel.event = encode_event("snapshot", {"index": index, "build": build, **snapshot}, build)
+            if first:
+                # Clients that connected while no snapshot could be built are still waiting for one
+                for client in list(channel.clients):
+                    client.push(build, channel.event, channel)
+            elif patch is not _UNCHANGED:
+                event = encode_event("patch", {"index": index, "build": build, "patch": patch}, build)
+                for client in list(channel.clients):
+                    client.push(build, event, channel)
+                STREAM_EVENTS.inc(index, "patch", amount=len(channel.clients))
+
+    async def events(self, index, last_event_id=None):
+        # Body of one /api/stream response
+        channel = self.channels.setdefault(index, _Channel())
+        client = _Client()
+        # Subscribe before syncing so no build between the two is missed
+        channel.clients.add(client)
+        self.n_clients += 1
+        STREAM_CLIENTS.inc(index)
+        try:
+            await self.sync(index)
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            # None when no snapshot could be built yet; it then arrives through the queue
+            sent = channel.build
+            if channel.event is not None and last_event_id != str(channel.build):
+                STREAM_EVENTS.inc(index, "snapshot")
+                yield channel.event
+            while True:
+                try:
+                    build, event = await asyncio.wait_for(client.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                # Patches already folded into the snapshot this client was sent
+                if sent is not None and build <= sent:
+                    continue
+                sent = build
+                yield event
+        finally:
+            channel.clients.discard(client)
+            self.n_clients -= 1
+            STREAM_CLIENTS.dec(index)
@@ -0,0 +1,197 @@
+import argparse
+import math
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+# Installed with scikit-learn; runs the AR(1) recursions as linear filters
+from scipy.signal import lfilter
+
+from data_store import normalize_columns, parse_sheet
+from sensex_macro_forecast_all_horizons import MODEL_DATA_PATH, NUMERIC_COLS
+
+# Synthetic long histories for scale testing, in the exact schema of
+# data/model_with_vix - Sheet1.csv (same raw headers, M/D/YYYY months, comma-formatted
+# CLOSE_SENSEX), so the forecaster, output.py and the benchmarks load them like the real sheet.
+#
+# The fit is a Gaussian copula over the sheet's numeric columns:
+# - each column keeps its empirical marginal (values are mapped through its normal scores),
+# - the normal scores keep the sheet's cross-correlation, and
+# - each one follows an AR(1) with the column's own lag-1 autocorrelation, so persistent
+#   series like the repo rate stay persistent.
+# CLOSE_SENSEX is compounded from the generated returns, with a weak pull of the log level
+# towards the sheet's latest close so arbitrarily long histories stay in a realistic range.
+# Rows are produced and written chunk by chunk; memory does not grow with the row count.
+#
+#   python synthetic_data.py ../data/synthetic_1m.csv --rows 1000000
+#   python synthetic_data.py ../data/synthetic_1m.parquet --rows 1000000   # needs pyarrow
+
+# Columns drawn from the copula; CLOSE_SENSEX is derived from SENSEX_RETURN
+COPULA_COLS = [col for col in NUMERIC_COLS if col != "CLOSE_SENSEX"]
+# Fraction of the gap between the log level and its anchor closed each month
+LEVEL_REVERSION = 0.02
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _normal_scores(values):
+    # Rank-based N(0, 1) scores, (rank + 0.5) / n through the inverse normal CDF
+    inv_cdf = NormalDist().inv_cdf
+    ranks = values.argsort(kind="stable").argsort(kind="stable")
+    return np.array([inv_cdf((r + 0.5) / len(values)) for r in ranks])
+
+
+def _psd_cholesky(matrix):
+    # Cholesky factor of the nearest positive-definite matrix (eigenvalues floored)
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        eigvals, eigvecs = np.linalg.eigh(matrix)
+        fixed = (eigvecs * np.maximum(eigvals, 1e-8)) @ eigvecs.T
+        return np.linalg.cholesky(fixed)
+
+
+def fit_profile(path=MODEL_DATA_PATH):
+    # Everything the generator needs, fitted from one sheet
+    df = parse_sheet(path, NUMERIC_COLS)
+    raw_columns = pd.read_csv(path, nrows=0).columns.tolist()
+    if normalize_columns(pd.DataFrame(columns=raw_columns)).columns.tolist() != df.columns.tolist():
+        raise ValueError(f"{path}: unexpected header")
+
+    data = df[COPULA_COLS].to_numpy(dtype=float)
+    n = len(data)
+    scores = np.column_stack([_normal_scores(data[:, j]) for j in range(data.shape[1])])
+
+    corr = np.corrcoef(scores, rowvar=False)
+    phi = np.array([np.corrcoef(s[:-1], s[1:])[0, 1] for s in scores.T])
+    phi = np.clip(np.nan_to_num(phi), -0.99, 0.99)
+    # Innovation covariance that gives the AR(1) scores a stationary correlation of `corr`
+    innovation_cov = corr * (1 - np.outer(phi, phi))
+
+    # Anchor the log level so its stationary mean sits at the latest close, given the
+    # average log return it is pushed up by every month
+    returns = df["SENSEX_RETURN"].to_numpy(dtype=float)
+    drift = np.log1p(returns).mean()
+    last_close = float(df["CLOSE_SENSEX"].iloc[-1])
+
+    first = pd.to_datetime(df["YEAR"].iloc[0])
+    return {
+        "raw_columns": raw_columns,
+        "columns": df.columns.tolist(),
+        "grid": np.array([NormalDist().inv_cdf((i + 0.5) / n) for i in range(n)]),
+        "sorted": np.sort(data, axis=0),
+        "phi": phi,
+        "stationary_chol": _psd_cholesky(corr),
+        "innovation_chol": _psd_cholesky(innovation_cov),
+        "start_level": last_close,
+        "anchor": math.log(last_close) - drift / LEVEL_REVERSION,
+        "start_month": first.year * 12 + first.month - 1,
+    }
+
+
+def generate_chunks(profile, rows, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0):
+    # Yields DataFrames of at most chunk_rows rows with the sheet's raw headers.
+    # CLOSE_SENSEX is numeric here; the CSV writer adds the thousands separators.
+    rng = np.random.default_rng(seed)
+    k = len(COPULA_COLS)
+    phi, chol = profile["phi"], profile["innovation_chol"]
+    ret_idx = COPULA_COLS.index("SENSEX_RETURN")
+    rename = dict(zip(profile["columns"], profile["raw_columns"]))
+
+    state = profile["stationary_chol"] @ rng.standard_normal(k)
+    log_level = math.log(profile["start_level"])
+    month = profile["start_month"]
+
+    for offset in range(0, rows, chunk_rows):
+        size = min(chunk_rows, rows - offset)
+        innovations = rng.standard_normal((size, k)) @ chol.T
+        scores = np.empty((size, k))
+        for j in range(k):
+            # s[t] = phi * s[t-1] + e[t], continuing from the previous chunk's last score
+            scores[:, j], _ = lfilter([1.0], [1.0, -phi[j]], innovations[:, j], zi=[phi[j] * state[j]])
+        state = scores[-1]
+
+        values = np.column_stack([
+            np.interp(scores[:, j], profile["grid"], profile["sorted"][:, j]) for j in range(k)
+        ])
+
+        # Compound the log level; the realised return replaces the drawn one so that
+        # SENSEX_RETURN and CLOSE_SENSEX stay consistent row to row
+        # (x[t] - anchor) = (1 - LEVEL_REVERSION) * (x[t-1] - anchor) + log(1 + r[t])
+        drawn = np.log1p(values[:, ret_idx])
+        keep = 1.0 - LEVEL_REVERSION
+        gap, _ = lfilter([1.0], [1.0, -keep], drawn, zi=[keep * (log_level - profile["anchor"])])
+        levels = profile["anchor"] + gap
+        values[:, ret_idx] = np.expm1(np.diff(levels, prepend=log_level))
+        log_level = levels[-1]
+
+        months = np.arange(month, month + size)
+        month += size
+        chunk = pd.DataFrame(values, columns=COPULA_COLS)
+        chunk["CLOSE_SENSEX"] = np.exp(levels)
+        chunk["YEAR"] = [f"{m % 12 + 1}/1/{m // 12}" for m in months]
+        yield chunk[profile["columns"]].rename(columns=rename)
+
+
+def write_csv(profile, path, rows, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0):
+    # Rows are formatted with one template (str.format is far quicker than DataFrame.to_csv
+    # with a float_format); CLOSE_SENSEX gets thousands separators and quotes like the sheet
+    fields = {"YEAR": "{}", "CLOSE_SENSEX": '"{:,.2f}"'}
+    template = ",".join(fields.get(col, "{:.9g}") for col in profile["columns"]) + "\n"
+    with open(path, "w", newline="") as f:
+        f.write(",".join(profile["raw_columns"]) + "\n")
+        for chunk in generate_chunks(profile, rows, chunk_rows, seed):
+            columns = [chunk[col].tolist() for col in chunk.columns]
+            f.writelines(template.format(*row) for row in zip(*columns))
+
+
+def write_parquet(profile, path, rows, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0):
+    # Same columns as the CSV; Parquet is typed, so CLOSE_SENSEX is stored as a plain float
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+
+    writer = None
+    try:
+        for chunk in generate_chunks(profile, rows, chunk_rows, seed):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def generate(path, rows, source=MODEL_DATA_PATH, chunk_rows=DEFAULT_CHUNK_ROWS, seed=0):
+    # Fit on `source` and stream `rows` synthetic months to `path` (.csv or .parquet).
+    # Written under a temporary name and renamed, so a reader never sees a partial file.
+    profile = fit_profile(source)
+    tmp_path = path + ".tmp"
+    writer = write_parquet if path.lower().endswith(".parquet") else write_csv
+    try:
+        writer(profile, tmp_path, rows, chunk_rows, seed)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic history in the model_with_vix schema")
+    parser.add_argument("output", help="destination .csv or .parquet file")
+    parser.add_argument("--rows", type=int, required=True, help="number of monthly rows")
+    parser.add_argument("--source", default=MODEL_DATA_PATH, help="sheet to fit (default: model_with_vix)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.output, args.rows, args.source, args.chunk_rows, args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 
 import React, { useEffect, useState } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Cell } from 'recharts';
-import { fetchContributionAnalysis } from '../services/backendService';
+import { fetchContributionAnalysis, watchDashboard } from '../services/backendService';
 import { ContributionData } from '../types';
 import { Info, HelpCircle } from 'lucide-react';
 
@@ -9,12 +9,10 @@ const ContributionPage: React.FC = () => {
   const [data, setData] = useState<ContributionData[]>([]);
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    fetchContributionAnalysis().then(res => {
-      setData(res);
-      setLoading(false);
-    });
-  }, []);
+  useEffect(() => watchDashboard(s => s.contribution, fetchContributionAnalysis, res => {
+    setData(res);
+    setLoading(false);
+  }), []);
 
   const CustomTooltip = ({ active, payload }: any) => {
     if (active && payload && payload.length) {
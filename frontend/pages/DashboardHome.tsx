@@ -2,22 +2,20 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { ArrowRight, BarChart3, TrendingUp, Zap, Target, Activity, CheckCircle2, Shield } from 'lucide-react';
-import { fetchSummary } from '../services/backendService';
+import { fetchSummary, watchDashboard } from '../services/backendService';
 import { SummaryData } from '../types';
 
 const DashboardHome: React.FC = () => {
   const [summary, setSummary] = useState<SummaryData | null>(null);
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    fetchSummary().then(data => {
-      setSummary(data);
-      setLoading(false);
-    }).catch(err => {
-      console.error(err);
-      setLoading(false);
-    });
-  }, []);
+  useEffect(() => watchDashboard(s => s.summary, fetchSummary, data => {
+    setSummary(data);
+    setLoading(false);
+  }, err => {
+    console.error(err);
+    setLoading(false);
+  }), []);
 
   const macroOutlook = summary?.macro_outlook || "Loading...";
   const riskBias = summary?.risk_bias || "Loading...";
@@ -1,19 +1,17 @@
 
 import React, { useEffect, useState } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
-import { fetchMacroExpectedSensex } from '../services/backendService';
+import { fetchMacroExpectedSensex, watchDashboard } from '../services/backendService';
 import { ExpectedSensexData } from '../types';
 
 const ExpectedSensexPage: React.FC = () => {
   const [data, setData] = useState<ExpectedSensexData[]>([]);
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    fetchMacroExpectedSensex().then(res => {
-      setData(res);
-      setLoading(false);
-    });
-  }, []);
+  useEffect(() => watchDashboard(s => s.expected_sensex, fetchMacroExpectedSensex, res => {
+    setData(res);
+    setLoading(false);
+  }), []);
 
   return (
     <div className="space-y-6 animate-in slide-in-from-bottom-4 duration-500">
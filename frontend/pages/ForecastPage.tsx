@@ -1,6 +1,6 @@
 
 import React, { useEffect, useState } from 'react';
-import { fetchForecasts, fetchDetailedMonthlyForecasts } from '../services/backendService';
+import { fetchForecasts, fetchDetailedMonthlyForecasts, watchDashboard } from '../services/backendService';
 import { ForecastData, DetailedForecastData, Scenario } from '../types';
 import { Calendar, TrendingUp, TrendingDown, Target, ShieldCheck } from 'lucide-react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
@@ -13,14 +13,21 @@ const ForecastPage: React.FC = () => {
 
   useEffect(() => {
     setLoading(true);
-    Promise.all([
-      fetchForecasts(scenario),
-      fetchDetailedMonthlyForecasts(scenario)
-    ]).then(([f, df]) => {
-      setForecast(f);
-      setDetailedForecast(df);
-      setLoading(false);
-    });
+    // The stream carries the bear/base/bull payloads; other scenarios are fetched directly
+    return watchDashboard<[ForecastData, DetailedForecastData]>(
+      s => (s.forecasts[scenario] && s.detailed_forecasts[scenario]
+        ? [s.forecasts[scenario], s.detailed_forecasts[scenario]]
+        : undefined),
+      () => Promise.all([
+        fetchForecasts(scenario),
+        fetchDetailedMonthlyForecasts(scenario)
+      ]),
+      ([f, df]) => {
+        setForecast(f);
+        setDetailedForecast(df);
+        setLoading(false);
+      }
+    );
   }, [scenario]);
 
   return (
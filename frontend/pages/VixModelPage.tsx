@@ -1,7 +1,7 @@
 
 import React, { useEffect, useState } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, ComposedChart } from 'recharts';
-import { fetchVixAdjustedSensex } from '../services/backendService';
+import { fetchVixAdjustedSensex, watchDashboard } from '../services/backendService';
 import { VixAdjustedData } from '../types';
 import { Zap, AlertCircle } from 'lucide-react';
 
@@ -9,12 +9,10 @@ const VixModelPage: React.FC = () => {
   const [data, setData] = useState<VixAdjustedData[]>([]);
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    fetchVixAdjustedSensex().then(res => {
-      setData(res);
-      setLoading(false);
-    });
-  }, []);
+  useEffect(() => watchDashboard(s => s.vix_adjusted, fetchVixAdjustedSensex, res => {
+    setData(res);
+    setLoading(false);
+  }), []);
 
   return (
     <div className="space-y-6 animate-in slide-in-from-bottom-4 duration-500">
@@ -24,7 +22,7 @@ const VixModelPage: React.FC = () => {
           <p className="text-slate-500 mt-1">Monthly refined estimates adjusting for market fear and systemic risk</p>
         </div>
         <div className="bg-white px-4 py-2 rounded-full border border-slate-200 text-sm font-medium text-slate-600">
-          Source: sensex_with_vix_trial_2.py
+          Source: sensex_macro_forecast_all_horizons.py
         </div>
       </header>
 
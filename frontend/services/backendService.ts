@@ -1,5 +1,5 @@
 
-import { ContributionData, ExpectedSensexData, VixAdjustedData, ForecastData, DetailedForecastData, SummaryData } from '../types';
+import { AttributionPage, RegimeForecast, ContributionData, ContributionIntervals, ExpectedSensexData, VixAdjustedData, ForecastData, DetailedForecastData, SummaryData, DashboardSnapshot } from '../types';
 
 const API_BASE = '/api';
 
@@ -15,6 +15,27 @@ export const fetchContributionAnalysis = async (): Promise<ContributionData[]> =
   return response.json();
 };
 
+// Bootstrap mean and percentile interval per feature; block > 1 resamples runs of months
+export const fetchContributionIntervals = async (resamples = 1000, block = 1, level = 90): Promise<ContributionIntervals> => {
+  const response = await fetch(`${API_BASE}/contribution?ci=true&resamples=${resamples}&block=${block}&level=${level}`);
+  if (!response.ok) throw new Error('Failed to fetch contribution intervals');
+  return response.json();
+};
+
+// Per-month log-odds and expected-return terms; page through `total` rows with offset/limit
+export const fetchAttribution = async (offset = 0, limit = 1000, columns?: string[]): Promise<AttributionPage> => {
+  const query = `offset=${offset}&limit=${limit}` + (columns ? `&columns=${columns.join(',')}` : '');
+  const response = await fetch(`${API_BASE}/attribution?${query}`);
+  if (!response.ok) throw new Error('Failed to fetch attribution');
+  return response.json();
+};
+
+export const fetchRegimeForecast = async (horizon = 12): Promise<RegimeForecast> => {
+  const response = await fetch(`${API_BASE}/regimes?horizon=${horizon}`);
+  if (!response.ok) throw new Error('Failed to fetch regime forecast');
+  return response.json();
+};
+
 export const fetchMacroExpectedSensex = async (): Promise<ExpectedSensexData[]> => {
   const response = await fetch(`${API_BASE}/expected_sensex`);
   if (!response.ok) {
@@ -30,14 +51,74 @@ export const fetchVixAdjustedSensex = async (): Promise<VixAdjustedData[]> => {
   return response.json();
 };
 
-export const fetchForecasts = async (scenario: 'base' | 'bull' | 'bear' = 'base'): Promise<ForecastData> => {
+export const fetchForecasts = async (scenario: 'base' | 'bull' | 'bear' | 'regime' = 'base'): Promise<ForecastData> => {
   const response = await fetch(`${API_BASE}/forecasts?scenario=${scenario}`);
   if (!response.ok) throw new Error('Failed to fetch forecasts');
   return response.json();
 };
 
-export const fetchDetailedMonthlyForecasts = async (scenario: 'base' | 'bull' | 'bear' = 'base'): Promise<DetailedForecastData> => {
+export const fetchDetailedMonthlyForecasts = async (scenario: 'base' | 'bull' | 'bear' | 'regime' = 'base'): Promise<DetailedForecastData> => {
   const response = await fetch(`${API_BASE}/detailed_forecasts?scenario=${scenario}`);
   if (!response.ok) throw new Error('Failed to fetch detailed forecasts');
   return response.json();
 };
+
+// JSON merge patch (RFC 7386): objects merge key by key, null removes, anything else replaces
+const applyMergePatch = (target: any, patch: any): any => {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+  const result = target !== null && typeof target === 'object' && !Array.isArray(target) ? { ...target } : {};
+  for (const [key, value] of Object.entries(patch)) {
+    if (value === null) delete result[key];
+    else result[key] = applyMergePatch(result[key], value);
+  }
+  return result;
+};
+
+// Live dashboard data from /api/stream instead of polling: onUpdate gets the full snapshot on
+// connect and again after every rebuild or ingest. EventSource reconnects by itself; onError
+// runs (and the stream is closed) when it gives up, e.g. on a 503 when the server is at its
+// client limit, or when the first connection fails. Returns a function that closes the stream.
+export const subscribeToDashboard = (
+  onUpdate: (snapshot: DashboardSnapshot) => void, index = 'sensex', onError?: () => void
+): (() => void) => {
+  const source = new EventSource(`${API_BASE}/stream?index=${encodeURIComponent(index)}`);
+  let snapshot: DashboardSnapshot | null = null;
+  source.onerror = () => {
+    if (snapshot && source.readyState !== EventSource.CLOSED) return;
+    source.close();
+    onError?.();
+  };
+  source.addEventListener('snapshot', (event) => {
+    snapshot = JSON.parse((event as MessageEvent).data);
+    onUpdate(snapshot as DashboardSnapshot);
+  });
+  source.addEventListener('patch', (event) => {
+    const { build, patch } = JSON.parse((event as MessageEvent).data);
+    if (!snapshot) return;
+    snapshot = { ...applyMergePatch(snapshot, patch), build };
+    onUpdate(snapshot as DashboardSnapshot);
+  });
+  return () => source.close();
+};
+
+// Page data from the stream: select picks the page's part of every snapshot. If the stream
+// cannot be used, fallback fetches the same data once from the plain route instead.
+// Returns a function that stops the updates.
+export const watchDashboard = <T>(
+  select: (snapshot: DashboardSnapshot) => T | undefined,
+  fallback: () => Promise<T>,
+  onData: (data: T) => void,
+  onFail: (err: unknown) => void = console.error,
+): (() => void) => {
+  let active = true;
+  const fetchOnce = () => fallback().then(data => { if (active) onData(data); }).catch(onFail);
+  const close = subscribeToDashboard(snapshot => {
+    const data = select(snapshot);
+    if (data === undefined) fetchOnce();
+    else if (active) onData(data);
+  }, 'sensex', fetchOnce);
+  return () => {
+    active = false;
+    close();
+  };
+};
@@ -4,6 +4,22 @@ export interface ContributionData {
   Contribution: number;
 }
 
+export interface ContributionInterval extends ContributionData {
+  Mean: number;
+  Lower: number;
+  Upper: number;
+}
+
+export interface ContributionIntervals {
+  resamples: number;
+  failed: number;
+  block: number;
+  level: number;
+  seed: number;
+  seconds: number;
+  contributions: ContributionInterval[];
+}
+
 export interface ExpectedSensexData {
   YEAR: string;
   CLOSE_SENSEX: number;
@@ -42,3 +58,39 @@ export interface SummaryData {
 }
 
 export type Scenario = 'base' | 'bull' | 'bear';
+
+// Consolidated payload pushed by /api/stream
+export interface DashboardSnapshot {
+  index: string;
+  build: number;
+  summary: SummaryData;
+  forecasts: Record<Scenario, ForecastData>;
+  detailed_forecasts: Record<Scenario, DetailedForecastData>;
+  contribution: ContributionData[];
+  expected_sensex: ExpectedSensexData[];
+  vix_adjusted: VixAdjustedData[];
+  version: { build: number; rows: number };
+}
+
+export interface AttributionPage {
+  total: number;
+  offset: number;
+  limit: number;
+  YEAR: string[];
+  columns: Record<string, number[]>;
+}
+
+export interface RegimeForecast {
+  regimes: string[];
+  cutoffs: number[];
+  current: string;
+  transition_matrix: number[][];
+  n_step_matrix: number[][];
+  stationary: number[];
+  regime_returns: { regime: string; months: number; mean: number; std: number }[];
+  months: string[];
+  probabilities: Record<string, number[]>;
+  expected_return: number[];
+  expected_level: number[];
+  level_std: number[];
+}